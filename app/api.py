@@ -0,0 +1,135 @@
+"""Sentiment REST API Module"""
+
+import json
+import os
+import threading
+from typing import Callable, Dict, List
+import pandas as pd
+from flask import Blueprint, Response, jsonify, request
+from loguru import logger
+
+from app.auth import api_auth_required
+from app.metrics import track
+
+MAX_BODY_BYTES = int(os.getenv('API_MAX_BODY_MB', 8)) * 1024 * 1024
+MAX_TEXTS = int(os.getenv('API_MAX_TEXTS', 10000))
+MAX_QUERY_RESULTS = int(os.getenv('API_MAX_QUERY_RESULTS', 1000))
+STREAM_THRESHOLD = int(os.getenv('API_STREAM_THRESHOLD', 256))  # Larger batches are streamed as NDJSON
+STREAM_CHUNK_SIZE = int(os.getenv('API_STREAM_CHUNK_SIZE', 256))
+MAX_CONCURRENT = int(os.getenv('API_MAX_CONCURRENT', 4))  # Requests scoring at once; the rest get 429
+MODEL_WAIT_TIMEOUT = float(os.getenv('MODEL_WAIT_TIMEOUT', 30))
+
+# Article columns returned by the query endpoint, with sentiment named as in analyze_batch results
+ARTICLE_FIELDS = {'title': 'title', 'url': 'url', 'source': 'source', 'created_at': 'created_at',
+                  'sentiment_label': 'label', 'sentiment_score': 'score', 'sentiment': 'sentiment'}
+
+
+def error(status: int, message: str, **headers) -> Response:
+    response = jsonify({'error': message})
+    response.status_code = status
+    response.headers.update(headers)
+    return response
+
+
+def create_api(model_loader, analyze_fn: Callable[[List[str]], List[Dict]],
+               collect_fn: Callable[[object, str, int], pd.DataFrame]) -> Blueprint:
+    """Blueprint for /api/v1, scoring through the dashboard's model, scheduler and result cache
+
+    analyze_fn scores a list of texts (the shared inference scheduler); collect_fn(analyzer, query,
+    max_results) collects and scores a query the same way the dashboard does.
+    """
+
+    api = Blueprint('api', __name__, url_prefix='/api/v1')
+    slots = threading.BoundedSemaphore(MAX_CONCURRENT)
+
+    def read_json():
+        """Parsed JSON body, or an error response for missing, oversized or malformed bodies"""
+        if request.content_length is None:
+            return None, error(411, "Content-Length is required")
+        if request.content_length > MAX_BODY_BYTES:
+            return None, error(413, f"Request body exceeds {MAX_BODY_BYTES // (1024 * 1024)} MB")
+        body = request.get_json(silent=True)
+        if not isinstance(body, dict):
+            return None, error(400, "Expected a JSON object body")
+        return body, None
+
+    def acquire():
+        """Take a scoring slot and the loaded analyzer, or an error response (429/503)"""
+        if not slots.acquire(blocking=False):
+            return None, error(429, "Too many concurrent requests", **{'Retry-After': '1'})
+        analyzer = model_loader.wait(timeout=MODEL_WAIT_TIMEOUT)
+        if analyzer is None:
+            slots.release()
+            return None, error(503, f"Model not ready ({model_loader.status()['state']})", **{'Retry-After': '5'})
+        return analyzer, None
+
+    @api.route('/sentiment', methods=['POST'])
+    @api_auth_required
+    def score_texts():
+        """{"texts": [...]} -> analyze_batch results, as JSON or (for large batches) NDJSON"""
+
+        body, failure = read_json()
+        if failure:
+            return failure
+        texts = body.get('texts')
+        if not isinstance(texts, list) or not all(isinstance(text, str) for text in texts):
+            return error(400, "'texts' must be a list of strings")
+        if len(texts) > MAX_TEXTS:
+            return error(413, f"At most {MAX_TEXTS} texts per request")
+
+        stream = len(texts) > STREAM_THRESHOLD or 'application/x-ndjson' in request.headers.get('Accept', '')
+        _, failure = acquire()
+        if failure:
+            return failure
+
+        if not stream:
+            try:
+                with track('api_sentiment'):
+                    return jsonify({'results': analyze_fn(texts)})
+            finally:
+                slots.release()
+
+        def generate():
+            with track('api_sentiment_stream'):
+                for start in range(0, len(texts), STREAM_CHUNK_SIZE):
+                    results = analyze_fn(texts[start:start + STREAM_CHUNK_SIZE])
+                    yield ''.join(json.dumps({'index': start + i, **result}) + '\n'
+                                  for i, result in enumerate(results))
+
+        logger.info(f"Streaming sentiment for {len(texts)} texts")
+        response = Response(generate(), mimetype='application/x-ndjson')
+        # The slot is held until the stream is finished or the client goes away
+        response.call_on_close(slots.release)
+        return response
+
+    @api.route('/sentiment/query', methods=['POST'])
+    @api_auth_required
+    def score_query():
+        """{"query": ..., "max_results": N} -> scored articles and their summary statistics"""
+
+        body, failure = read_json()
+        if failure:
+            return failure
+        query = body.get('query')
+        max_results = body.get('max_results', 50)
+        if not isinstance(query, str) or not query.strip():
+            return error(400, "'query' must be a non-empty string")
+        if not isinstance(max_results, int) or not 1 <= max_results <= MAX_QUERY_RESULTS:
+            return error(400, f"'max_results' must be an integer between 1 and {MAX_QUERY_RESULTS}")
+
+        analyzer, failure = acquire()
+        if failure:
+            return failure
+        try:
+            with track('api_sentiment_query'):
+                df = collect_fn(analyzer, query, max_results)
+                articles = df[[c for c in ARTICLE_FIELDS if c in df.columns]].rename(columns=ARTICLE_FIELDS)
+                return jsonify({
+                    'query': query,
+                    'summary': analyzer.get_summary_statistics(df),
+                    'articles': json.loads(articles.to_json(orient='records', date_format='iso'))
+                })
+        finally:
+            slots.release()
+
+    return api
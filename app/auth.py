@@ -1,8 +1,10 @@
 """Authentication Module"""
 
+import hmac
+import os
 import yaml
 from functools import wraps
-from flask import session, redirect
+from flask import session, redirect, request, jsonify
 
 def load_config():
     """Load configuration from YAML"""
@@ -14,6 +16,8 @@ def load_config():
 
 config = load_config()
 USERS = config.get('users', {'admin': 'admin123', 'demo': 'demo123'})
+API_KEYS = [key.strip() for key in os.getenv('API_KEYS', ','.join(config.get('api', {}).get('keys', []))).split(',')
+            if key.strip()]
 
 def check_auth(username, password):
     """Check if username/password is valid"""
@@ -28,6 +32,23 @@ def login_required(f):
         return f(*args, **kwargs)
     return decorated_function
 
+def check_api_key(key):
+    """Check an API key against API_KEYS in constant time"""
+    return bool(key) and any(hmac.compare_digest(key, valid) for valid in API_KEYS)
+
+def api_auth_required(f):
+    """Decorator for API routes: an X-API-Key / Bearer key, or a logged-in dashboard session"""
+    @wraps(f)
+    def decorated_function(*args, **kwargs):
+        key = request.headers.get('X-API-Key')
+        authorization = request.headers.get('Authorization', '')
+        if not key and authorization.startswith('Bearer '):
+            key = authorization[len('Bearer '):]
+        if not (check_api_key(key) or session.get('logged_in')):
+            return jsonify({'error': 'Authentication required'}), 401
+        return f(*args, **kwargs)
+    return decorated_function
+
 def is_authenticated():
     """Check if user is logged in"""
     return session.get('logged_in', False)
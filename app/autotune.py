@@ -0,0 +1,235 @@
+"""Inference Autotuning Module
+
+Benchmarks torch/onnxruntime thread counts, batch sizes and token budgets on this machine and
+saves the fastest configuration next to the model:
+
+    python -m app.autotune [--input headlines.csv] [--text-column text] [--texts 256]
+
+SentimentAnalyzer applies the saved configuration at startup (explicit BATCH_SIZE,
+MAX_BATCH_TOKENS or INFERENCE_THREADS settings still win). With AUTOTUNE=startup the model
+loader tunes on first start when nothing is saved yet, and AUTOTUNE_RUNTIME=true keeps
+adjusting the token budget from observed throughput while serving.
+"""
+
+import json
+import os
+import random
+import threading
+import time
+from typing import Dict, List, Optional, Sequence
+from loguru import logger
+
+TUNING_FILE = 'tuning.json'
+BATCH_SIZES = [8, 16, 32, 64, 128]
+TOKEN_BUDGETS = [1024, 2048, 4096, 8192, 16384]
+MIN_TOKENS, MAX_TOKENS = 256, 32768
+
+# Sample workload when no corpus is given: headline plus description sized texts of mixed length
+SAMPLE_SUBJECTS = ["Shares of the chipmaker", "The central bank", "Regional lawmakers", "The airline", "Researchers",
+                   "The startup", "Consumer groups", "Energy prices", "The city council", "Hospital staff"]
+SAMPLE_CLAUSES = ["rose sharply after quarterly results beat expectations",
+                  "warned of slowing growth in the second half of the year",
+                  "announced a new partnership to expand into overseas markets",
+                  "faced criticism over delays to the long-promised upgrade",
+                  "said the outage had been resolved for most customers",
+                  "reported record demand despite supply shortages",
+                  "cut its forecast as costs continued to climb",
+                  "approved funding for the next phase of the project",
+                  "is under investigation following complaints from users",
+                  "expects conditions to remain stable through the winter"]
+
+
+def tuning_path(model_cache_dir: str, model_name: str) -> str:
+    from app.backends import artifact_dir
+    return os.path.join(artifact_dir(model_cache_dir, model_name), TUNING_FILE)
+
+
+def sample_texts(count: int = 256, seed: int = 0) -> List[str]:
+    """Deterministic synthetic workload of one to four sentences per text"""
+    rng = random.Random(seed)
+    return [' '.join(f"{rng.choice(SAMPLE_SUBJECTS)} {rng.choice(SAMPLE_CLAUSES)}."
+                     for _ in range(rng.choice([1, 1, 2, 3, 4])))
+            for _ in range(count)]
+
+
+def thread_candidates(cpus: Optional[int] = None) -> List[int]:
+    """Powers of two up to the core count, plus the core count itself"""
+    cpus = cpus or os.cpu_count() or 1
+    candidates = [1 << i for i in range(cpus.bit_length()) if 1 << i <= cpus]
+    return sorted(set(candidates + [cpus]))
+
+
+def load_tuning(path: str, backend: str) -> Optional[Dict]:
+    """Saved configuration for a backend, or None if missing or tuned on a different machine"""
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        tuning = json.load(f).get(backend)
+    if tuning and tuning['cpu_count'] != os.cpu_count():
+        logger.warning(f"Ignoring {path}: tuned for {tuning['cpu_count']} CPUs, this host has {os.cpu_count()}")
+        return None
+    return tuning
+
+
+def save_tuning(path: str, backend: str, tuning: Dict):
+    """Store one backend's configuration, keeping the others in the same file"""
+    saved = {}
+    if os.path.exists(path):
+        with open(path) as f:
+            saved = json.load(f)
+    saved[backend] = tuning
+    tmp = path + '.tmp'
+    with open(tmp, 'w') as f:
+        json.dump(saved, f, indent=2)
+    os.replace(tmp, path)
+
+
+def measure(analyzer, texts: Sequence[str], repeats: int = 3) -> Dict:
+    """Best-of-repeats throughput of the model over texts with the analyzer's current settings"""
+
+    best = None
+    for _ in range(repeats):
+        started = time.perf_counter()
+        analyzer._run_model(list(texts))
+        seconds = time.perf_counter() - started
+        best = seconds if best is None else min(best, seconds)
+    return {'texts_per_sec': len(texts) / best, 'seconds': best}
+
+
+def autotune(analyzer, texts: Optional[Sequence[str]] = None, save: bool = True) -> Dict:
+    """Pick threads, then batch size, then token budget, each by measured throughput
+
+    Tuning one setting at a time (keeping the best of the previous step) needs a dozen or so
+    runs instead of the full grid, and the three interact little once threads are fixed.
+    """
+
+    texts = [t for t in (texts or sample_texts()) if t]
+    tuner, analyzer.tuner = analyzer.tuner, None  # Keep the runtime tuner from reacting to the sweep
+    results = []
+
+    def run(**settings):
+        for name, value in settings.items():
+            analyzer.apply_setting(name, value)
+        result = {'threads': analyzer.threads, 'batch_size': analyzer.batch_size,
+                  'max_batch_tokens': analyzer.max_batch_tokens, **measure(analyzer, texts)}
+        results.append(result)
+        logger.info(f"Autotune: {result['threads']} threads, batch {result['batch_size']}, "
+                    f"{result['max_batch_tokens']} tokens -> {result['texts_per_sec']:.1f} texts/s")
+        return result['texts_per_sec']
+
+    started = time.perf_counter()
+    try:
+        analyzer._run_model(texts)  # Warm up before timing
+        for name, candidates in (('threads', thread_candidates()), ('batch_size', BATCH_SIZES),
+                                 ('max_batch_tokens', TOKEN_BUDGETS)):
+            best = max(candidates, key=lambda value: run(**{name: value}))
+            analyzer.apply_setting(name, best)
+    finally:
+        analyzer.tuner = tuner
+
+    chosen = {'threads': analyzer.threads, 'batch_size': analyzer.batch_size,
+              'max_batch_tokens': analyzer.max_batch_tokens}
+    tuning = {
+        **chosen,
+        'texts_per_sec': round(max(r['texts_per_sec'] for r in results
+                                   if all(r[name] == value for name, value in chosen.items())), 2),
+        'cpu_count': os.cpu_count(),
+        'sample_texts': len(texts),
+        'tuned_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'results': results
+    }
+    logger.info(f"✅ Autotune picked {tuning['threads']} threads, batch {tuning['batch_size']}, "
+                f"{tuning['max_batch_tokens']} tokens ({tuning['texts_per_sec']} texts/s) "
+                f"in {time.perf_counter() - started:.1f}s")
+
+    if save:
+        path = tuning_path(analyzer.model_cache_dir, analyzer.model_name)
+        save_tuning(path, analyzer.backend_name, tuning)
+        logger.info(f"Saved tuning to {path}")
+    return tuning
+
+
+class RuntimeTuner:
+    """Hill-climbs the token budget on observed model throughput while serving
+
+    Every `window` model batches the token budget moves one step in the current direction; the
+    direction reverses when throughput (tokens/s) fell since the last window. Batches slower than
+    max_batch_ms always shrink the budget, to keep interactive latency bounded.
+    """
+
+    def __init__(self, analyzer, window: int = 20, step: float = 1.25, max_batch_ms: float = 0):
+        self.analyzer = analyzer
+        self.window = window
+        self.step = step
+        self.max_batch_ms = max_batch_ms
+        self.direction = 1
+        self.last_throughput = None
+        self.lock = threading.Lock()
+        self._reset()
+
+    def _reset(self):
+        self.batches = 0
+        self.tokens = 0
+        self.seconds = 0.0
+        self.slowest = 0.0
+
+    def observe(self, tokens: int, seconds: float):
+        with self.lock:
+            self.batches += 1
+            self.tokens += tokens
+            self.seconds += seconds
+            self.slowest = max(self.slowest, seconds)
+            if self.batches >= self.window:
+                self._adjust()
+                self._reset()
+
+    def _adjust(self):
+        throughput = self.tokens / self.seconds if self.seconds else 0.0
+        if self.max_batch_ms and self.slowest * 1000 > self.max_batch_ms:
+            self.direction = -1
+        elif self.last_throughput is not None and throughput < self.last_throughput:
+            self.direction = -self.direction
+        self.last_throughput = throughput
+
+        current = self.analyzer.max_batch_tokens
+        budget = int(min(max(current * self.step ** self.direction, MIN_TOKENS), MAX_TOKENS))
+        if budget != current:
+            self.analyzer.max_batch_tokens = budget
+            logger.debug(f"Runtime tuning: {throughput:,.0f} tokens/s, slowest batch {self.slowest * 1000:.0f}ms; "
+                         f"token budget {current} -> {budget}")
+
+    def stats(self) -> Dict:
+        return {'max_batch_tokens': self.analyzer.max_batch_tokens, 'direction': self.direction,
+                'last_tokens_per_sec': self.last_throughput}
+
+
+def main():
+    import argparse
+    from app.batch_score import detect_format, read_chunks
+    from app.metrics import configure_logging
+    from app.sentiment_analyzer import SentimentAnalyzer, normalize_text
+
+    parser = argparse.ArgumentParser(description="Tune inference threads and batching for this machine")
+    parser.add_argument('--input', help="sample corpus (.csv, .jsonl/.ndjson or .parquet); synthetic if omitted")
+    parser.add_argument('--text-column', default='text')
+    parser.add_argument('--texts', type=int, default=256, help="texts per measurement")
+    parser.add_argument('--dry-run', action='store_true', help="report without saving")
+    args = parser.parse_args()
+
+    configure_logging(os.getenv('LOG_LEVEL', 'INFO'))
+    texts = sample_texts(args.texts)
+    if args.input:
+        texts = []
+        for chunk in read_chunks(args.input, detect_format(args.input), 10000):
+            texts.extend(chunk[args.text_column].fillna('').astype(str))
+            if len(texts) >= args.texts:
+                break
+        texts = texts[:args.texts]
+
+    analyzer = SentimentAnalyzer()
+    tuning = autotune(analyzer, [normalize_text(text) for text in texts], save=not args.dry_run)
+    print(json.dumps({k: v for k, v in tuning.items() if k != 'results'}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
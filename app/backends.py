@@ -0,0 +1,147 @@
+"""Inference Backends Module"""
+
+import os
+import re
+import numpy as np
+import torch
+from transformers import AutoConfig, AutoModelForSequenceClassification
+from loguru import logger
+
+
+def artifact_dir(model_cache_dir: str, model_name: str) -> str:
+    """Directory under ./models holding exported/quantized artifacts for a model"""
+    slug = re.sub(r'[^A-Za-z0-9._-]+', '--', model_name.strip('/'))
+    path = os.path.join(model_cache_dir, 'artifacts', slug)
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+class TorchBackend:
+    """Eager full-precision PyTorch model"""
+
+    def __init__(self, model_name: str, model_cache_dir: str, device: int = -1):
+        self.model_name = model_name
+        self.model_cache_dir = model_cache_dir
+        self.device = torch.device(f'cuda:{device}' if device >= 0 else 'cpu')
+        self.model = self.load_model()
+        self.id2label = self.model.config.id2label
+
+    def load_model(self):
+        model = AutoModelForSequenceClassification.from_pretrained(self.model_name, cache_dir=self.model_cache_dir)
+        return model.to(self.device).eval()
+
+    def forward(self, input_ids: np.ndarray, attention_mask: np.ndarray) -> np.ndarray:
+        """Class probabilities for a padded batch"""
+        with torch.inference_mode():
+            logits = self.model(
+                input_ids=torch.from_numpy(input_ids).to(self.device),
+                attention_mask=torch.from_numpy(attention_mask).to(self.device)
+            ).logits
+        return logits.softmax(dim=-1).float().cpu().numpy()
+
+    def set_threads(self, threads: int):
+        """Intra-op threads for CPU inference (process-wide in torch)"""
+        torch.set_num_threads(threads)
+
+
+class QuantizedTorchBackend(TorchBackend):
+    """PyTorch model with dynamic int8 quantization of Linear layers (CPU only)"""
+
+    def __init__(self, model_name: str, model_cache_dir: str, device: int = -1):
+        super().__init__(model_name, model_cache_dir, device=-1)
+
+    def load_model(self):
+        path = os.path.join(artifact_dir(self.model_cache_dir, self.model_name), 'torch-int8.pt')
+        if os.path.exists(path):
+            logger.info(f"Loading quantized model from {path}")
+            return torch.load(path).eval()
+
+        model = super().load_model()
+        model = torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+        torch.save(model, path)
+        logger.info(f"Saved quantized model to {path}")
+        return model.eval()
+
+
+class OnnxBackend:
+    """Exported ONNX model run with onnxruntime (CPU only)"""
+
+    quantize = False
+
+    def __init__(self, model_name: str, model_cache_dir: str, device: int = -1):
+        try:
+            import onnxruntime
+        except ImportError:
+            raise ImportError("The onnx backends require onnxruntime: pip install -r requirements-onnx.txt")
+
+        self.model_name = model_name
+        self.model_cache_dir = model_cache_dir
+        self.id2label = AutoConfig.from_pretrained(model_name, cache_dir=model_cache_dir).id2label
+        self.onnxruntime = onnxruntime
+        self.session = self.create_session()
+
+    def create_session(self, threads: int = 0):
+        """Inference session over the exported model; 0 threads lets onnxruntime choose"""
+        options = self.onnxruntime.SessionOptions()
+        options.graph_optimization_level = self.onnxruntime.GraphOptimizationLevel.ORT_ENABLE_ALL
+        options.intra_op_num_threads = threads
+        return self.onnxruntime.InferenceSession(self.export(), options, providers=['CPUExecutionProvider'])
+
+    def export(self) -> str:
+        """Path to the ONNX artifact, exporting it on first use"""
+        directory = artifact_dir(self.model_cache_dir, self.model_name)
+        path = os.path.join(directory, 'model.onnx')
+
+        if not os.path.exists(path):
+            model = AutoModelForSequenceClassification.from_pretrained(self.model_name, cache_dir=self.model_cache_dir).eval()
+            dummy = torch.ones((1, 8), dtype=torch.long)
+            torch.onnx.export(
+                model, (dummy, dummy), path,
+                input_names=['input_ids', 'attention_mask'],
+                output_names=['logits'],
+                dynamic_axes={name: {0: 'batch', 1: 'sequence'} for name in ('input_ids', 'attention_mask', 'logits')},
+                opset_version=14
+            )
+            logger.info(f"Exported ONNX model to {path}")
+
+        if not self.quantize:
+            return path
+
+        quantized_path = os.path.join(directory, 'model-int8.onnx')
+        if not os.path.exists(quantized_path):
+            from onnxruntime.quantization import quantize_dynamic, QuantType
+            quantize_dynamic(path, quantized_path, weight_type=QuantType.QInt8)
+            logger.info(f"Saved quantized ONNX model to {quantized_path}")
+        return quantized_path
+
+    def forward(self, input_ids: np.ndarray, attention_mask: np.ndarray) -> np.ndarray:
+        """Class probabilities for a padded batch"""
+        logits = self.session.run(['logits'], {'input_ids': input_ids, 'attention_mask': attention_mask})[0]
+        logits = logits - logits.max(axis=-1, keepdims=True)
+        probs = np.exp(logits)
+        return probs / probs.sum(axis=-1, keepdims=True)
+
+    def set_threads(self, threads: int):
+        """Thread counts are fixed per session, so the session is recreated"""
+        self.session = self.create_session(threads)
+
+
+class QuantizedOnnxBackend(OnnxBackend):
+    """Exported ONNX model with dynamic int8 weight quantization"""
+
+    quantize = True
+
+
+BACKENDS = {
+    'torch': TorchBackend,
+    'torch-int8': QuantizedTorchBackend,
+    'onnx': OnnxBackend,
+    'onnx-int8': QuantizedOnnxBackend
+}
+
+
+def load_backend(name: str, model_name: str, model_cache_dir: str, device: int = -1):
+    """Instantiate an inference backend by name"""
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown inference backend '{name}', expected one of {sorted(BACKENDS)}")
+    return BACKENDS[name](model_name, model_cache_dir, device=device)
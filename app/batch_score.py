@@ -0,0 +1,254 @@
+"""Batch Scoring Module
+
+Scores large offline corpora chunk by chunk and writes the results as Parquet part files:
+
+    python -m app.batch_score headlines.csv scored/ [--text-column text] [--chunk-size 10000]
+
+Input is CSV, JSONL or Parquet (by extension, or --format). Only one chunk is held in memory
+at a time. Progress is checkpointed in <output>/_checkpoint.json after every part, so running
+the same command again after an interruption resumes where it stopped.
+"""
+
+import argparse
+import json
+import os
+import time
+from typing import Dict, Iterator, Optional
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+from loguru import logger
+
+from app.metrics import configure_logging
+from app.sentiment_analyzer import SentimentAggregate
+
+CHECKPOINT_FILE = '_checkpoint.json'
+FORMATS = {'.csv': 'csv', '.jsonl': 'jsonl', '.ndjson': 'jsonl', '.parquet': 'parquet', '.pq': 'parquet'}
+
+
+def detect_format(path: str) -> str:
+    extension = os.path.splitext(path)[1].lower()
+    if extension not in FORMATS:
+        raise ValueError(f"Cannot tell the format of '{path}', pass --format (csv, jsonl or parquet)")
+    return FORMATS[extension]
+
+
+def read_chunks(path: str, input_format: str, chunk_size: int) -> Iterator[pd.DataFrame]:
+    """Stream an input file as DataFrames of at most chunk_size rows"""
+
+    if input_format == 'csv':
+        # As text: types inferred per chunk would differ between chunks (an empty column reads as float)
+        with pd.read_csv(path, chunksize=chunk_size, dtype='string') as reader:
+            yield from reader
+    elif input_format == 'jsonl':
+        with pd.read_json(path, lines=True, chunksize=chunk_size) as reader:
+            yield from reader
+    elif input_format == 'parquet':
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=chunk_size):
+            yield batch.to_pandas()
+    else:
+        raise ValueError(f"Unsupported input format '{input_format}'")
+
+
+def skip_rows(chunks: Iterator[pd.DataFrame], rows: int) -> Iterator[pd.DataFrame]:
+    """Drop the first `rows` rows of a chunk stream"""
+    for chunk in chunks:
+        if rows >= len(chunk):
+            rows -= len(chunk)
+            continue
+        yield chunk.iloc[rows:] if rows else chunk
+        rows = 0
+
+
+class Checkpoint:
+    """Progress of a scoring run: rows and parts written, plus the running summary"""
+
+    def __init__(self, output_dir: str):
+        self.path = os.path.join(output_dir, CHECKPOINT_FILE)
+        self.state = None
+
+    def load(self) -> Optional[Dict]:
+        if os.path.exists(self.path):
+            with open(self.path) as f:
+                self.state = json.load(f)
+        return self.state
+
+    def save(self, state: Dict):
+        # Write-then-rename, so an interruption never leaves a half-written checkpoint
+        tmp = self.path + '.tmp'
+        with open(tmp, 'w') as f:
+            json.dump(state, f, indent=2)
+        os.replace(tmp, self.path)
+        self.state = state
+
+
+def input_fingerprint(path: str) -> Dict:
+    stat = os.stat(path)
+    return {'path': os.path.abspath(path), 'size': stat.st_size, 'mtime': stat.st_mtime}
+
+
+def part_path(output_dir: str, part: int) -> str:
+    return os.path.join(output_dir, f"part-{part:05d}.parquet")
+
+
+def unify_schema(schema: Optional[pa.Schema], other: pa.Schema) -> pa.Schema:
+    """A schema both can be cast to: types are widened where Arrow allows (null to any type, int to float),
+    columns whose types conflict become strings and new columns are appended"""
+
+    if schema is None:
+        return pa.schema(list(other))
+    fields = []
+    for field in schema:
+        if field.name not in other.names:
+            fields.append(field)
+            continue
+        try:
+            fields.append(pa.unify_schemas([pa.schema([field]), pa.schema([other.field(field.name)])],
+                                           promote_options='permissive').field(0))
+        except (pa.ArrowInvalid, pa.ArrowTypeError, pa.ArrowNotImplementedError):
+            fields.append(pa.field(field.name, pa.string()))
+    return pa.schema(fields + [field for field in other if field.name not in schema.names])
+
+
+def conform(table: pa.Table, schema: pa.Schema) -> pa.Table:
+    """Cast table to schema, filling columns it lacks with nulls"""
+    return pa.Table.from_arrays([table.column(field.name).cast(field.type) if field.name in table.column_names
+                                 else pa.nulls(len(table), field.type) for field in schema], schema=schema)
+
+
+def write_table(table: pa.Table, path: str):
+    # Write-then-rename, so an interruption never leaves a half-written part
+    pq.write_table(table, path + '.tmp')
+    os.replace(path + '.tmp', path)
+
+
+def promote_parts(output_dir: str, parts: int, schema: pa.Schema):
+    """Rewrite the written parts whose schema differs from schema"""
+    for part in range(parts):
+        path = part_path(output_dir, part)
+        if not pq.read_schema(path).equals(schema):
+            write_table(conform(pq.read_table(path), schema), path)
+
+
+def write_part(df: pd.DataFrame, output_dir: str, part: int, schema: Optional[pa.Schema]) -> pa.Schema:
+    """Write one part file in the schema shared by all parts, returning it
+    
+    When the chunk's types do not fit the parts written so far (a column empty until now, or holding text
+    after numbers), the shared schema is widened and the earlier parts are rewritten to it.
+    """
+
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    unified = unify_schema(schema, table.schema)
+    if schema is not None and not unified.equals(schema):
+        changed = [field.name for field in unified if field.name not in schema.names
+                   or field.type != schema.field(field.name).type]
+        logger.info(f"Widening column(s) {changed} in the {part} part(s) written so far")
+        promote_parts(output_dir, part, unified)
+    write_table(conform(table, unified), part_path(output_dir, part))
+    return unified
+
+
+def score_file(input_path: str, output_dir: str, text_column: str = 'text', chunk_size: int = 10000,
+               input_format: Optional[str] = None, drop_text: bool = False, restart: bool = False,
+               analyzer=None) -> Dict:
+    """Score input_path into Parquet parts under output_dir, resuming from its checkpoint"""
+
+    input_format = input_format or detect_format(input_path)
+    os.makedirs(output_dir, exist_ok=True)
+    checkpoint = Checkpoint(output_dir)
+    fingerprint = input_fingerprint(input_path)
+
+    state = None if restart else checkpoint.load()
+    if state is not None and state['input'] != fingerprint:
+        raise ValueError(f"{output_dir} holds a checkpoint for a different or modified input "
+                         f"({state['input']['path']}); use --restart or another output directory")
+    if state is None:
+        for name in os.listdir(output_dir):
+            if name.startswith('part-') and name.endswith('.parquet'):
+                os.remove(os.path.join(output_dir, name))
+        state = {'input': fingerprint, 'text_column': text_column, 'rows_done': 0, 'parts': 0,
+                 'done': False, 'summary': SentimentAggregate().to_state()}
+    elif state['done']:
+        logger.info(f"{input_path} is already fully scored into {output_dir}")
+        return SentimentAggregate.from_state(state['summary']).to_dict()
+    else:
+        logger.info(f"Resuming after {state['rows_done']:,} rows ({state['parts']} parts)")
+
+    if analyzer is None:
+        from app.sentiment_analyzer import SentimentAnalyzer
+        analyzer = SentimentAnalyzer()
+
+    aggregate = SentimentAggregate.from_state(state['summary'])
+    schema = None
+    if state['parts']:
+        # An interrupted widening can leave the parts in different schemas
+        for part in range(state['parts']):
+            schema = unify_schema(schema, pq.read_schema(part_path(output_dir, part)))
+        promote_parts(output_dir, state['parts'], schema)
+    started = time.perf_counter()
+    rows_this_run = 0
+
+    chunks = skip_rows(read_chunks(input_path, input_format, chunk_size), state['rows_done'])
+    for chunk in chunks:
+        chunk_started = time.perf_counter()
+        if text_column not in chunk.columns:
+            raise ValueError(f"Column '{text_column}' not found in {input_path} (columns: {list(chunk.columns)})")
+
+        chunk = chunk.reset_index(drop=True)
+        chunk[text_column] = chunk[text_column].fillna('').astype(str)
+        scored = analyzer.analyze_dataframe(chunk, text_column)
+        aggregate.update(scored['sentiment'].to_numpy())
+        if drop_text:
+            scored = scored.drop(columns=[text_column])
+        schema = write_part(scored, output_dir, state['parts'], schema)
+
+        state['rows_done'] += len(chunk)
+        state['parts'] += 1
+        state['summary'] = aggregate.to_state()
+        checkpoint.save(state)
+
+        rows_this_run += len(chunk)
+        elapsed = time.perf_counter() - started
+        logger.info(f"{state['rows_done']:,} rows scored | {len(chunk) / (time.perf_counter() - chunk_started):,.0f} rows/s "
+                    f"(chunk), {rows_this_run / elapsed:,.0f} rows/s (run)")
+
+    state['done'] = True
+    checkpoint.save(state)
+    if analyzer.pool is not None:
+        analyzer.pool.shutdown()
+
+    elapsed = time.perf_counter() - started
+    logger.info(f"✅ Scored {rows_this_run:,} rows in {elapsed:.1f}s "
+                f"({rows_this_run / elapsed if elapsed else 0:,.0f} rows/s); {state['parts']} parts in {output_dir}")
+    return aggregate.to_dict()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Score a CSV/JSONL/Parquet corpus into Parquet, resumably")
+    parser.add_argument('input', help="input file (.csv, .jsonl/.ndjson or .parquet)")
+    parser.add_argument('output', help="output directory for part-*.parquet files and the checkpoint")
+    parser.add_argument('--text-column', default='text')
+    parser.add_argument('--chunk-size', type=int, default=10000, help="rows read, scored and written at a time")
+    parser.add_argument('--format', choices=sorted(set(FORMATS.values())), help="override format detection")
+    parser.add_argument('--workers', type=int, help="inference worker processes (default: INFERENCE_WORKERS)")
+    parser.add_argument('--drop-text', action='store_true', help="leave the text column out of the output")
+    parser.add_argument('--restart', action='store_true', help="ignore an existing checkpoint and start over")
+    parser.add_argument('--log-level', default=os.getenv('LOG_LEVEL', 'INFO'))
+    args = parser.parse_args()
+
+    configure_logging(args.log_level)
+
+    from app.sentiment_analyzer import SentimentAnalyzer
+    analyzer = SentimentAnalyzer()
+    if args.workers is not None:
+        analyzer.workers = args.workers
+        analyzer.pool_min_rows = min(analyzer.pool_min_rows, args.chunk_size)
+
+    summary = score_file(args.input, args.output, text_column=args.text_column, chunk_size=args.chunk_size,
+                         input_format=args.format, drop_text=args.drop_text, restart=args.restart,
+                         analyzer=analyzer)
+    print(json.dumps(summary, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+"""Batch Planning Module"""
+
+from typing import List, Sequence, Optional, Tuple
+import numpy as np
+
+
+def plan_batches(lengths: Sequence[int], max_tokens: int,
+                 max_batch_size: Optional[int] = None) -> List[List[int]]:
+    """Group indices into length-sorted batches whose padded size fits max_tokens"""
+
+    order = sorted(range(len(lengths)), key=lambda i: lengths[i])
+
+    batches = []
+    current = []
+    for i in order:
+        # Sorted ascending, so the newcomer is always the longest member
+        padded = lengths[i] * (len(current) + 1)
+        full = max_batch_size is not None and len(current) >= max_batch_size
+        if current and (padded > max_tokens or full):
+            batches.append(current)
+            current = []
+        current.append(i)
+
+    if current:
+        batches.append(current)
+
+    return batches
+
+
+def padding_waste(lengths: Sequence[int], batches: List[List[int]]) -> float:
+    """Fraction of padded token slots that are padding"""
+
+    padded = sum(max(lengths[i] for i in batch) * len(batch) for batch in batches if batch)
+    if not padded:
+        return 0.0
+    return 1 - sum(lengths) / padded
+
+
+def pad_batch(sequences: List[List[int]], pad_id: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Right-pad token id lists into input_ids and attention_mask arrays"""
+
+    width = max(len(seq) for seq in sequences)
+    input_ids = np.full((len(sequences), width), pad_id, dtype=np.int64)
+    attention_mask = np.zeros((len(sequences), width), dtype=np.int64)
+
+    for row, seq in enumerate(sequences):
+        input_ids[row, :len(seq)] = seq
+        attention_mask[row, :len(seq)] = 1
+
+    return input_ids, attention_mask
@@ -0,0 +1,172 @@
+"""Lexical Cascade Scoring Module"""
+
+import re
+import zlib
+from typing import Dict, List, Sequence, Tuple
+import numpy as np
+from loguru import logger
+
+TOKEN_PATTERN = re.compile(r"[a-z][a-z']*|[.,;:!?]")
+NEGATORS = {'not', 'no', 'never', "n't", 'without', 'nor', 'cannot', "don't", "doesn't", "didn't", "isn't",
+            "wasn't", "aren't", "won't", "can't", 'fails', 'failed'}
+CLAUSE_END = set('.,;:!?')
+FEATURE_BITS = 18
+
+# Seed weights: headline vocabulary with a clear polarity (positive > 0). fit() refines them.
+LEXICON = {
+    **dict.fromkeys("""good great excellent strong stronger record best win wins won winning success successful
+        gain gains gained surge surges surged soar soars soared rally rallies rallied rise rises rose boost boosts
+        boosted growth grow grows improve improves improved improvement recovery recover recovers profit profits
+        profitable beat beats upbeat optimism optimistic positive praise praised celebrate celebrates breakthrough
+        love loves amazing wonderful impressive robust thrive thrives thriving expand expands expansion upgrade
+        upgraded approve approved approval award awarded hope hopeful happy safe secure stable benefit benefits
+        innovative innovation opportunity opportunities lead leads leading tops jump jumps jumped""".split(), 1.0),
+    **dict.fromkeys("""bad poor weak weaker worst lose loses lost loss losses fail fails failed failure crash crashes
+        crashed plunge plunges plunged slump slumps slumped fall falls fell drop drops dropped decline declines
+        declined cut cuts slash slashes layoffs layoff fired fire fires crisis scandal fraud lawsuit sued sue
+        probe investigation warning warns warned fear fears worry worries worried concern concerns risk risks
+        threat threatens attack attacks killed kill kills dead death deaths war conflict collapse collapses
+        collapsed recession inflation downgrade downgraded bankrupt bankruptcy default debt shortage outage
+        breach hack hacked terrible awful disaster negative pessimistic miss misses missed struggle struggles
+        struggling halt halts halted ban bans banned delay delays delayed recall recalls""".split(), -1.0)
+}
+
+
+def tokenize(text: str) -> List[str]:
+    """Lower-case word tokens; words after a negator (up to the end of the clause) get a not_ prefix"""
+    tokens = []
+    negated = False
+    for token in TOKEN_PATTERN.findall(str(text).lower()):
+        if token in CLAUSE_END:
+            negated = False
+            continue
+        if token in NEGATORS or token.endswith("n't"):
+            negated = True
+            continue
+        tokens.append(f"not_{token}" if negated else token)
+    return tokens
+
+
+def feature_id(token: str) -> int:
+    return zlib.crc32(token.encode('utf-8')) & ((1 << FEATURE_BITS) - 1)
+
+
+class LexicalScorer:
+    """Hashed bag-of-words linear model: P(positive) = sigmoid(bias + sum(weights) / sqrt(tokens))"""
+
+    def __init__(self, weights: np.ndarray = None, bias: float = 0.0, scale: float = 3.0):
+        if weights is None:
+            weights = np.zeros(1 << FEATURE_BITS, dtype=np.float32)
+            for word, weight in LEXICON.items():
+                weights[feature_id(word)] = weight
+                weights[feature_id(f"not_{word}")] = -weight
+            weights *= scale
+        self.weights = weights
+        self.bias = bias
+
+    @staticmethod
+    def featurize(texts: Sequence[str]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Flat feature ids, the text each belongs to, and per-text length normalizers"""
+        ids, owners, counts = [], [], np.zeros(len(texts), dtype=np.float32)
+        for row, text in enumerate(texts):
+            tokens = tokenize(text)
+            ids.extend(feature_id(token) for token in tokens)
+            owners.extend([row] * len(tokens))
+            counts[row] = len(tokens)
+        return np.array(ids, dtype=np.int64), np.array(owners, dtype=np.int64), 1 / np.sqrt(np.maximum(counts, 1))
+
+    def _margins(self, ids: np.ndarray, owners: np.ndarray, norm: np.ndarray) -> np.ndarray:
+        return self.bias + np.bincount(owners, weights=self.weights[ids], minlength=len(norm)) * norm
+
+    def predict_proba(self, texts: Sequence[str]) -> np.ndarray:
+        """P(positive) per text"""
+        if not len(texts):
+            return np.zeros(0)
+        return 1 / (1 + np.exp(-self._margins(*self.featurize(texts))))
+
+    def fit(self, texts: Sequence[str], positive: np.ndarray, epochs: int = 200, learning_rate: float = 0.5,
+            l2: float = 1e-3) -> 'LexicalScorer':
+        """Distill from reference labels (1 = positive) by logistic regression, regularized toward the current weights"""
+
+        ids, owners, norm = self.featurize(texts)
+        target = np.asarray(positive, dtype=np.float64)
+        prior = self.weights.astype(np.float64)
+        weights = prior.copy()
+        for _ in range(epochs):
+            self.weights = weights
+            error = 1 / (1 + np.exp(-self._margins(ids, owners, norm))) - target
+            gradient = np.bincount(ids, weights=(error * norm)[owners], minlength=len(weights)) / len(texts)
+            weights = weights - learning_rate * (gradient + l2 * (weights - prior))
+            self.bias -= learning_rate * float(error.mean())
+        self.weights = weights.astype(np.float32)
+        return self
+
+    def score(self, texts: Sequence[str]) -> Tuple[np.ndarray, np.ndarray]:
+        """(confidence, is_positive) per text; confidence is the probability of the predicted label"""
+        probs = self.predict_proba(texts)
+        return np.maximum(probs, 1 - probs), probs >= 0.5
+
+    def save(self, path: str):
+        np.savez_compressed(path, weights=self.weights, bias=self.bias)
+        logger.info(f"Saved lexical scorer to {path}")
+
+    @classmethod
+    def load(cls, path: str) -> 'LexicalScorer':
+        data = np.load(path)
+        return cls(weights=data['weights'], bias=float(data['bias']))
+
+
+def split_confident(scorer: LexicalScorer, texts: Sequence[str], threshold: float) -> Tuple[Dict[int, Dict], List[int]]:
+    """Results for texts the scorer is at least `threshold` confident about, and indices of the rest"""
+
+    confidence, positive = scorer.score(texts)
+    confident = {}
+    uncertain = []
+    for i, (score, is_positive) in enumerate(zip(confidence.tolist(), positive.tolist())):
+        if score < threshold:
+            uncertain.append(i)
+            continue
+        confident[i] = {
+            'label': 'POSITIVE' if is_positive else 'NEGATIVE',
+            'score': score,
+            'sentiment': score if is_positive else -score,
+            'stage': 'lexical'
+        }
+    return confident, uncertain
+
+
+def main():
+    """Distill the lexical scorer from the transformer's labels on a sample corpus"""
+    import argparse
+    from app.batch_score import detect_format, read_chunks
+    from app.sentiment_analyzer import SentimentAnalyzer, cascade_weights_path, normalize_text
+
+    parser = argparse.ArgumentParser(description="Fit the cascade's lexical scorer to the transformer's labels")
+    parser.add_argument('input', help="sample corpus (.csv, .jsonl/.ndjson or .parquet)")
+    parser.add_argument('--text-column', default='text')
+    parser.add_argument('--limit', type=int, default=50000, help="texts to label and fit on")
+    parser.add_argument('--output', help="weights file (default: CASCADE_WEIGHTS or the model's artifact directory)")
+    args = parser.parse_args()
+
+    texts = []
+    for chunk in read_chunks(args.input, detect_format(args.input), 10000):
+        texts.extend(normalize_text(text) for text in chunk[args.text_column].fillna('').astype(str))
+        if len(texts) >= args.limit:
+            break
+    texts = texts[:args.limit]
+
+    analyzer = SentimentAnalyzer()
+    logger.info(f"Labelling {len(texts)} texts with {analyzer.model_name}")
+    positive = np.array([result['label'] == 'POSITIVE' for result in analyzer._run_model(texts)])
+
+    # Hold out a tenth to report how well the distilled scorer agrees with the model
+    split = len(texts) - max(len(texts) // 10, 1)
+    scorer = LexicalScorer().fit(texts[:split], positive[:split])
+    agreement = float(np.mean((scorer.predict_proba(texts[split:]) >= 0.5) == positive[split:]))
+    logger.info(f"Held-out agreement with the model: {agreement:.1%}")
+
+    scorer.save(args.output or cascade_weights_path(analyzer.model_cache_dir, analyzer.model_name))
+
+
+if __name__ == "__main__":
+    main()
@@ -2,25 +2,39 @@
 
 import os
 from datetime import datetime
+import numpy as np
 import pandas as pd
-import plotly.express as px
 import plotly.graph_objects as go
-from dash import Dash, dcc, html, Input, Output, State
+from dash import Dash, dcc, html, Input, Output, State, Patch, no_update
+from dash.exceptions import PreventUpdate
 import dash_bootstrap_components as dbc
-from wordcloud import WordCloud
-import base64
-from io import BytesIO
 from loguru import logger
 from dotenv import load_dotenv
-from flask import Flask, session
+from flask import Flask, Response, session, jsonify
 import secrets
 
-from app.data_collector import DataCollector
-from app.sentiment_analyzer import SentimentAnalyzer
+from app.data_collector import DataCollector, normalize_query
+from app.frames import compact_frame, concat_frames
+from app.model_loader import ModelLoader
+from app.inference_scheduler import InferenceScheduler
+from app.history_store import HistoryStore
+from app.sentiment_analyzer import SentimentAggregate, CATEGORIES
+from app.jobs import JobManager, ResultStore
+from app.wordcloud_renderer import WordCloudRenderer
+from app.prefetch import (WatchlistPrefetcher, WATCHLIST_ENABLED, WATCHLIST_QUERIES, WATCHLIST_MAX_RESULTS,
+                          WATCHLIST_REFRESH_SECONDS, WATCHLIST_CONCURRENCY, WATCHLIST_CPU_SHARE, WATCHLIST_PRERENDER,
+                          WATCHLIST_PRERENDER_RESULTS)
+from app.api import create_api
+from app.metrics import track, timed, metrics_response, configure_logging, SCHEDULER_QUEUE_DEPTH
 from app.auth import check_auth, is_authenticated, get_current_user
 
 load_dotenv()
 
+DEBUG_MODE = os.getenv('DEBUG_MODE', 'true').lower() == 'true'
+# Under the debug reloader, `python -m app.dashboard` first runs as a file watcher that only (re)starts the
+# serving process (WERKZEUG_RUN_MAIN=true); background work belongs to the serving process alone
+RELOADER_WATCHER = __name__ == '__main__' and DEBUG_MODE and os.getenv('WERKZEUG_RUN_MAIN') != 'true'
+
 # Flask server
 server = Flask(__name__)
 server.secret_key = os.getenv('FLASK_SECRET_KEY', secrets.token_hex(16))
@@ -29,7 +43,75 @@ server.secret_key = os.getenv('FLASK_SECRET_KEY', secrets.token_hex(16))
 app = Dash(__name__, server=server, external_stylesheets=[dbc.themes.FLATLY, dbc.icons.FONT_AWESOME], suppress_callback_exceptions=True)
 
 data_collector = DataCollector()
-sentiment_analyzer = SentimentAnalyzer()
+history_store = HistoryStore()
+
+# The model loads (and warms up) in the background while the server starts serving pages
+model_loader = ModelLoader()
+if not RELOADER_WATCHER:
+    model_loader.start()
+MODEL_WAIT_TIMEOUT = float(os.getenv('MODEL_WAIT_TIMEOUT', 30))
+
+# Concurrent "Analyze" clicks share batches on a single inference worker
+inference_scheduler = InferenceScheduler(
+    lambda texts: model_loader.analyzer.analyze_batch(texts),
+    max_batch_size=int(os.getenv('SCHEDULER_MAX_BATCH', 128)),
+    max_wait_ms=float(os.getenv('SCHEDULER_MAX_WAIT_MS', 10))
+)
+SCHEDULER_QUEUE_DEPTH.set_function(lambda: inference_scheduler.queue.qsize())
+
+
+# Analyze clicks run as background jobs whose stages are polled by the browser
+job_manager = JobManager(max_workers=int(os.getenv('JOB_WORKERS', 4)))
+
+# Finished results stay server-side under a result ID; each tab is rendered from them when first opened
+result_store = ResultStore(max_results=int(os.getenv('RESULT_STORE_SIZE', 32)))
+
+# Live mode re-collects the watched query this often and sends only what changed
+LIVE_POLL_SECONDS = float(os.getenv('LIVE_POLL_SECONDS', 30))
+
+wordcloud_renderer = WordCloudRenderer(
+    width=int(os.getenv('WORDCLOUD_WIDTH', 1200)),
+    height=int(os.getenv('WORDCLOUD_HEIGHT', 600)),
+    image_format=os.getenv('WORDCLOUD_FORMAT', 'PNG'),
+    quality=int(os.getenv('WORDCLOUD_QUALITY', 80))
+)
+
+
+@server.route('/ready')
+def ready():
+    status = model_loader.status()
+    status['scheduler'] = inference_scheduler.stats()
+    status['prefetch'] = prefetcher.stats()
+    return jsonify(status), 200 if status['state'] == 'ready' else 503
+
+
+@server.route('/metrics')
+def metrics():
+    body, content_type = metrics_response()
+    return Response(body, content_type=content_type)
+
+
+def collect_and_score(sentiment_analyzer, query, max_results, analyze_fn=None, poll=False, refresh=False):
+    """Incrementally collect a query; only articles not seen before are scored and archived"""
+    
+    def analyze_new(new):
+        new = sentiment_analyzer.analyze_dataframe(new, analyze_fn=analyze_fn or inference_scheduler.analyze_batch)
+        return archive_scored(new, query)
+    
+    with track('collect'):
+        return data_collector.collect_incremental(query, max_results, analyze=analyze_new, poll=poll,
+                                                  refresh=refresh)
+
+
+def archive_scored(new, query):
+    """Write newly scored rows to the history store; returns them as the query's stored set keeps them"""
+    history_store.write(new, query)
+    # The archive keeps the full text; the in-memory set only needs the word cloud's tokens
+    return compact_frame(new, drop_text=True)
+
+
+# JSON API for other services, sharing the model, scheduler and result cache with the dashboard
+server.register_blueprint(create_api(model_loader, inference_scheduler.analyze_batch, collect_and_score))
 
 # Login Page Layout
 login_layout = dbc.Container([
@@ -125,25 +207,33 @@ dashboard_layout = dbc.Container([
                         dbc.Col([
                             dbc.Label([html.I(className="fas fa-search me-2"), "Search Query"], 
                                     style={'font-weight': '600', 'color': '#2c3e50'}),
-                            dbc.Input(id="search-query", placeholder="e.g., artificial intelligence", 
+                            dbc.Input(id="search-query", placeholder="e.g., artificial intelligence; climate change", 
                                     value="artificial intelligence", style={'font-size': '1rem'})
                         ], width=8),
                         dbc.Col([
                             dbc.Label([html.I(className="fas fa-sliders-h me-2"), "Max Results"], 
                                     style={'font-weight': '600', 'color': '#2c3e50'}),
-                            dbc.Input(id="max-results", type="number", value=40, min=10, max=100, 
+                            dbc.Input(id="max-results", type="number", value=40, min=10, max=1000, 
                                     style={'font-size': '1rem'})
                         ], width=4)
                     ], className="mb-3"),
                     dbc.Button([html.I(className="fas fa-rocket me-2"), "Analyze Sentiment"], 
                              id="analyze-btn", color="primary", size="lg", className="w-100",
-                             style={'font-size': '1.1rem', 'font-weight': '600', 'padding': '12px'})
+                             style={'font-size': '1.1rem', 'font-weight': '600', 'padding': '12px'}),
+                    dbc.Switch(id="live-toggle", value=False, className="mt-3",
+                               label=f"Live: watch this query and add new articles every {LIVE_POLL_SECONDS:g}s")
                 ])
             ], className="shadow-sm", style={'border': 'none', 'border-radius': '10px'})
         ])
     ], className="mb-4"),
     
-    dcc.Loading(id="loading", type="circle", children=html.Div(id="loading-output"), color="#3498db"),
+    dcc.Store(id="job-state"),
+    dcc.Interval(id="job-poll", interval=500, disabled=True),
+    dcc.Store(id="result-id"),
+    dcc.Store(id="rendered-tabs"),
+    dcc.Store(id="live-state"),
+    dcc.Interval(id="live-poll", interval=LIVE_POLL_SECONDS * 1000, disabled=True),
+    html.Div(id="loading-output", className="text-center mb-3", style={'color': '#7f8c8d'}),
     
     # Stats Cards
     dbc.Row([
@@ -203,15 +293,23 @@ dashboard_layout = dbc.Container([
             dbc.Card([
                 dbc.CardBody([
                     dbc.Tabs([
-                        dbc.Tab(dcc.Graph(id="pie-chart", config={'displayModeBar': True}), 
-                              label="📊 Sentiment Distribution"),
+                        dbc.Tab(html.Div([
+                                    dbc.Switch(id="pie-counts", value=False, label="Show counts", className="mt-3"),
+                                    dcc.Graph(id="pie-chart", config={'displayModeBar': True})
+                                ]),
+                              label="📊 Sentiment Distribution", tab_id="pie"),
                         dbc.Tab(dcc.Graph(id="timeline", config={'displayModeBar': True}), 
-                              label="📈 Sentiment Timeline"),
-                        dbc.Tab(dcc.Graph(id="histogram", config={'displayModeBar': True}), 
-                              label="📉 Score Distribution"),
+                              label="📈 Sentiment Timeline", tab_id="timeline"),
+                        dbc.Tab(html.Div([
+                                    dbc.Switch(id="histogram-log", value=False, label="Log scale", className="mt-3"),
+                                    dcc.Graph(id="histogram", config={'displayModeBar': True})
+                                ]),
+                              label="📉 Score Distribution", tab_id="histogram"),
                         dbc.Tab(html.Div(id="wordcloud", className="p-4"), 
-                              label="☁️ Word Cloud")
-                    ])
+                              label="☁️ Word Cloud", tab_id="wordcloud"),
+                        dbc.Tab(html.Div(id="comparison", className="p-4"),
+                              label="⚖️ Comparison", tab_id="comparison")
+                    ], id="viz-tabs", active_tab="pie")
                 ])
             ], className="shadow-sm", style={'border': 'none', 'border-radius': '10px'})
         ])
@@ -292,47 +390,395 @@ def display_user(login_data):
     return get_current_user()
 
 
-# Dashboard update callback
+# Analyze button: start (or join) a background job
+@app.callback(
+    [Output("job-state", "data"),
+     Output("job-poll", "disabled"),
+     Output("live-toggle", "value")],
+    Input("analyze-btn", "n_clicks"),
+    [State("search-query", "value"),
+     State("max-results", "value")],
+    prevent_initial_call=True
+)
+def start_analysis(n_clicks, query, max_results):
+    job = job_manager.submit(
+        (normalize_query(query or ''), max_results),
+        lambda job: run_analysis(job, query, max_results)
+    )
+    # A full render replaces the live figures, so live mode stops
+    return {'job_id': job.id, 'delivered': []}, False, False
+
+
+# Which poll_analysis outputs each published stage fills
+STAGE_OUTPUTS = {
+    'stats': (0, 4),
+    'result': (4, 5)
+}
+STAGE_OUTPUT_COUNT = 5
+
+
+# Job polling: deliver each stage once, as soon as it is ready
 @app.callback(
     [Output("total-items", "children"),
      Output("positive-count", "children"),
      Output("neutral-count", "children"),
      Output("negative-count", "children"),
-     Output("pie-chart", "figure"),
+     Output("result-id", "data"),
+     Output("loading-output", "children"),
+     Output("job-state", "data", allow_duplicate=True),
+     Output("job-poll", "disabled", allow_duplicate=True)],
+    Input("job-poll", "n_intervals"),
+    State("job-state", "data"),
+    prevent_initial_call=True
+)
+def poll_analysis(n_intervals, job_state):
+    job = job_manager.get(job_state['job_id']) if job_state else None
+    if job is None:
+        return [no_update] * STAGE_OUTPUT_COUNT + ["", no_update, True]
+    
+    snapshot = job.snapshot()
+    stages = snapshot['stages']
+    delivered = set(job_state['delivered'])
+    outputs = [no_update] * STAGE_OUTPUT_COUNT
+    
+    if snapshot['status'] == 'failed':
+        outputs = ["Error"] * 4 + [None]
+    else:
+        for stage, (first, last) in STAGE_OUTPUTS.items():
+            if stage in stages and stage not in delivered:
+                value = stages[stage]
+                outputs[first:last] = value if isinstance(value, tuple) else [value]
+                delivered.add(stage)
+    
+    finished = snapshot['status'] != 'running'
+    progress = "" if finished else html.Span([dbc.Spinner(size="sm", color="primary", spinner_class_name="me-2"),
+                                               snapshot['progress']])
+    if snapshot['status'] == 'failed':
+        progress = f"Error: {snapshot['error']}"
+    return outputs + [progress, {'job_id': job.id, 'delivered': sorted(delivered)}, finished]
+
+
+# Tabs in output order; only the open tab is rendered, once per result
+TAB_OUTPUTS = ['pie', 'timeline', 'histogram', 'wordcloud', 'comparison']
+GRAPH_TABS = {'pie', 'timeline', 'histogram'}
+
+
+@app.callback(
+    [Output("pie-chart", "figure"),
      Output("timeline", "figure"),
      Output("histogram", "figure"),
      Output("wordcloud", "children"),
-     Output("loading-output", "children")],
-    Input("analyze-btn", "n_clicks"),
+     Output("comparison", "children"),
+     Output("rendered-tabs", "data")],
+    [Input("viz-tabs", "active_tab"),
+     Input("result-id", "data")],
+    [State("rendered-tabs", "data"),
+     State("pie-counts", "value"),
+     State("histogram-log", "value")],
+    prevent_initial_call=True
+)
+def render_tab(active_tab, result_id, rendered, show_counts, log_scale):
+    if not rendered or rendered['result_id'] != result_id:
+        rendered = {'result_id': result_id, 'tabs': []}
+    if active_tab in rendered['tabs']:
+        raise PreventUpdate
+    
+    outputs = [no_update] * len(TAB_OUTPUTS)
+    content = tab_content(result_id, active_tab)
+    outputs[TAB_OUTPUTS.index(active_tab)] = (style_figure(active_tab, content, show_counts, log_scale)
+                                              if active_tab in GRAPH_TABS else content)
+    return outputs + [{'result_id': result_id, 'tabs': rendered['tabs'] + [active_tab]}]
+
+
+def tab_content(result_id, tab):
+    """Figure or component for one tab of a stored result, rendered on first use"""
+    
+    def render(result):
+        if 'message' in result:
+            return create_empty_figure() if tab in GRAPH_TABS else result['message']
+        df = result['df']
+        if tab == 'pie':
+            return create_pie_chart(df)
+        if tab == 'timeline':
+            return create_timeline(df)
+        if tab == 'histogram':
+            return create_histogram(df)
+        if tab == 'wordcloud':
+            return create_wordcloud(df)
+        if result['frames']:
+            return create_comparison(model_loader.analyzer, result['frames'], result['report'])
+        return COMPARISON_HINT
+    
+    content = result_store.view(result_id, tab, render) if result_id else None
+    if content is None:
+        # No result (a failed run) or one evicted from the store
+        return create_empty_figure() if tab in GRAPH_TABS else ("Please run the analysis again" if result_id else "")
+    return content
+
+
+def style_figure(tab, figure, show_counts, log_scale):
+    """Apply the restyle switches to a server-rendered figure (a copy: stored figures are shared)"""
+    if tab == 'pie' and show_counts:
+        return go.Figure(figure).update_traces(textinfo='label+value')
+    if tab == 'histogram' and log_scale:
+        return go.Figure(figure).update_yaxes(type='log')
+    return figure
+
+
+# Re-styling the current figure needs no server round trip
+app.clientside_callback(
+    """
+    function(showCounts, figure) {
+        if (!figure || !figure.data || !figure.data.length) {
+            return window.dash_clientside.no_update;
+        }
+        const textinfo = showCounts ? 'label+value' : 'label+percent';
+        return Object.assign({}, figure, {data: figure.data.map(trace => Object.assign({}, trace, {textinfo}))});
+    }
+    """,
+    Output("pie-chart", "figure", allow_duplicate=True),
+    Input("pie-counts", "value"),
+    State("pie-chart", "figure"),
+    prevent_initial_call=True
+)
+
+app.clientside_callback(
+    """
+    function(logScale, figure) {
+        if (!figure || !figure.layout) {
+            return window.dash_clientside.no_update;
+        }
+        const yaxis = Object.assign({}, figure.layout.yaxis, {type: logScale ? 'log' : 'linear'});
+        return Object.assign({}, figure, {layout: Object.assign({}, figure.layout, {yaxis})});
+    }
+    """,
+    Output("histogram", "figure", allow_duplicate=True),
+    Input("histogram-log", "value"),
+    State("histogram", "figure"),
+    prevent_initial_call=True
+)
+
+
+# Live mode: one full render when switched on, then only deltas for newly collected articles
+@app.callback(
+    [Output("total-items", "children", allow_duplicate=True),
+     Output("positive-count", "children", allow_duplicate=True),
+     Output("neutral-count", "children", allow_duplicate=True),
+     Output("negative-count", "children", allow_duplicate=True),
+     Output("pie-chart", "figure", allow_duplicate=True),
+     Output("timeline", "figure", allow_duplicate=True),
+     Output("histogram", "figure", allow_duplicate=True),
+     Output("loading-output", "children", allow_duplicate=True),
+     Output("live-state", "data"),
+     Output("live-poll", "disabled"),
+     Output("result-id", "data", allow_duplicate=True),
+     Output("rendered-tabs", "data", allow_duplicate=True)],
+    Input("live-toggle", "value"),
     [State("search-query", "value"),
-     State("max-results", "value")],
+     State("max-results", "value"),
+     State("pie-counts", "value"),
+     State("histogram-log", "value")],
     prevent_initial_call=True
 )
-def update_dashboard(n_clicks, query, max_results):
-    try:
-        df = data_collector.collect_data(query, max_results)
+def toggle_live(enabled, query, max_results, show_counts, log_scale):
+    if not enabled:
+        return [no_update] * 7 + ["", None, True, no_update, no_update]
+    
+    if len(split_queries(query)) != 1:
+        return [no_update] * 7 + ["Live mode watches a single query", None, True, no_update, no_update]
+    sentiment_analyzer = model_loader.wait(timeout=MODEL_WAIT_TIMEOUT)
+    if sentiment_analyzer is None:
+        return [no_update] * 7 + ["Model is still loading, please try again in a moment", None, True,
+                                  no_update, no_update]
+    
+    with track('live_baseline'):
+        df = collect_and_score(sentiment_analyzer, query, max_results)
         if df.empty:
-            empty_fig = create_empty_figure()
-            return "0", "0", "0", "0", empty_fig, empty_fig, empty_fig, "No data found", ""
+            # Same figure structure as with articles, so later deltas have traces to land in
+            df = pd.DataFrame({'created_at': pd.Series(dtype='datetime64[ns]'), 'url': pd.Series(dtype=object),
+                               'sentiment': pd.Series(dtype=float),
+                               'sentiment_category': pd.Categorical([], categories=CATEGORIES)})
         
-        df = sentiment_analyzer.analyze_dataframe(df)
-        stats = sentiment_analyzer.get_summary_statistics(df)
+        aggregate = SentimentAggregate().update(df['sentiment'].to_numpy(dtype=np.float64))
+        state = {'query': query, 'max_results': max_results, 'aggregate': aggregate.to_state(),
+                 'histogram': histogram_counts(df).tolist(), **live_cursor(df)}
+        cards = stat_cards(aggregate.to_dict()) if aggregate.total else ("0",) * 4
+        # The live charts are rendered up front since deltas are applied to them; the other tabs stay lazy
+        figures = (style_figure('pie', create_pie_chart(df), show_counts, log_scale), create_timeline(df, live=True),
+                   style_figure('histogram', create_histogram(df), show_counts, log_scale))
+        result_id = store_result(df)
+    return [*cards, *figures, live_status(0), state, False, result_id,
+            {'result_id': result_id, 'tabs': sorted(GRAPH_TABS)}]
+
+
+@app.callback(
+    [Output("total-items", "children", allow_duplicate=True),
+     Output("positive-count", "children", allow_duplicate=True),
+     Output("neutral-count", "children", allow_duplicate=True),
+     Output("negative-count", "children", allow_duplicate=True),
+     Output("pie-chart", "figure", allow_duplicate=True),
+     Output("timeline", "extendData"),
+     Output("histogram", "figure", allow_duplicate=True),
+     Output("loading-output", "children", allow_duplicate=True),
+     Output("live-state", "data", allow_duplicate=True)],
+    Input("live-poll", "n_intervals"),
+    State("live-state", "data"),
+    prevent_initial_call=True
+)
+def live_tick(n_intervals, state):
+    sentiment_analyzer = model_loader.analyzer
+    if not state or sentiment_analyzer is None:
+        raise PreventUpdate
+    
+    with track('live_tick'):
+        # Polls fetch what was published since the last one instead of waiting out the search cache
+        df = collect_and_score(sentiment_analyzer, state['query'], state['max_results'], poll=True)
+        new = unseen_articles(df, state)
+        if new.empty:
+            # Nothing new: an empty 204 response, whatever the size of the history
+            raise PreventUpdate
+        
+        aggregate = SentimentAggregate.from_state(state['aggregate']).update(new['sentiment'].to_numpy(dtype=np.float64))
+        previous = np.asarray(state['histogram'], dtype=np.int64)
+        histogram = previous + histogram_counts(new)
+        
+        # Only changed bars are patched, and the pie gets its three slice values
+        histogram_patch = Patch()
+        for i in np.flatnonzero(histogram != previous):
+            histogram_patch['data'][0]['y'][int(i)] = int(histogram[i])
         
-        return (
-            str(stats['total_items']),
-            f"{stats['positive_count']} ({stats['positive_ratio']:.1f}%)",
-            f"{stats['neutral_count']}",
-            f"{stats['negative_count']} ({stats['negative_ratio']:.1f}%)",
-            create_pie_chart(df),
-            create_timeline(df),
-            create_histogram(df),
-            create_wordcloud(df),
-            ""
-        )
-    except Exception as e:
-        logger.error(f"Error: {e}")
-        empty_fig = create_empty_figure()
-        return "Error", "Error", "Error", "Error", empty_fig, empty_fig, empty_fig, f"Error: {str(e)}", ""
+        counts = dict(zip(CATEGORIES, aggregate.counts.tolist()))
+        present = [category for category in CATEGORIES if counts[category]]
+        pie_patch = Patch()
+        pie_patch['data'][0]['labels'] = present
+        pie_patch['data'][0]['values'] = [counts[category] for category in present]
+        pie_patch['data'][0]['marker']['colors'] = [CATEGORY_COLORS[category] for category in present]
+        
+        # Everything in df has now been sent, so its newest article is the new cursor
+        state = {**state, 'aggregate': aggregate.to_state(), 'histogram': histogram.tolist(), **live_cursor(df)}
+    
+    return [*stat_cards(aggregate.to_dict()), pie_patch, timeline_extension(new), histogram_patch,
+            live_status(len(new)), state]
+
+
+def live_status(new_count):
+    return html.Span([html.I(className="fas fa-circle me-2", style={'color': '#e74c3c', 'font-size': '0.7rem'}),
+                      f"Live: +{new_count} new articles at {pd.Timestamp.now():%H:%M:%S}"])
+
+
+def live_cursor(df):
+    """Newest publication time delivered to the browser, plus the URLs published exactly then"""
+    if df.empty:
+        return {'cursor': None, 'cursor_urls': []}
+    newest = df['created_at'].max()
+    return {'cursor': newest.isoformat(), 'cursor_urls': df.loc[df['created_at'] == newest, 'url'].tolist()}
+
+
+def unseen_articles(df, state):
+    """Rows of df the browser has not been sent yet, judged by the cursor it holds
+    
+    The cursor lives in the browser's live-state, so a tick whose response is lost is simply
+    re-sent by the next one.
+    """
+    if df.empty or state['cursor'] is None:
+        return df
+    cursor = pd.Timestamp(state['cursor'])
+    return df[(df['created_at'] > cursor) | ((df['created_at'] == cursor) & ~df['url'].isin(state['cursor_urls']))]
+
+
+def histogram_counts(df):
+    return np.histogram(df['sentiment'].dropna().to_numpy(), bins=HISTOGRAM_BINS, range=(-1, 1))[0]
+
+
+def timeline_extension(new):
+    """extendData appending new articles to the live timeline's per-category traces"""
+    new = new.sort_values('created_at')
+    x, y, traces = [], [], []
+    for index, category in enumerate(CATEGORIES):
+        group = new[new['sentiment_category'] == category]
+        if group.empty:
+            continue
+        x.append(group['created_at'].dt.strftime('%Y-%m-%d %H:%M:%S').tolist())
+        y.append(group['sentiment'].tolist())
+        traces.append(index)
+    return [{'x': x, 'y': y}, traces, TIMELINE_MAX_POINTS]
+
+
+COMPARISON_HINT = "Separate several queries with ';' to compare them side by side"
+
+
+def split_queries(query):
+    """Distinct ';'-separated queries, in order"""
+    queries = [q.strip() for q in (query or '').split(';') if q.strip()]
+    return list(dict.fromkeys(queries))
+
+
+# What tabs render from: the analyzed frame is kept with only these columns
+RESULT_COLUMNS = ['created_at', 'url', 'sentiment', 'sentiment_category', 'tokens', 'text']
+
+
+def store_result(df, frames=None, report=None):
+    return result_store.put({'df': df[df.columns.intersection(RESULT_COLUMNS)], 'frames': frames, 'report': report})
+
+
+def publish_placeholder(job, card_value, message):
+    job.publish('stats', (card_value,) * 4)
+    job.publish('result', result_store.put({'message': message}))
+
+
+@timed('analysis')
+def run_analysis(job, query, max_results):
+    """Collect and score a query, publishing its stat cards and the ID of its stored result"""
+    
+    job.report("Waiting for the model...")
+    sentiment_analyzer = model_loader.wait(timeout=MODEL_WAIT_TIMEOUT)
+    if sentiment_analyzer is None:
+        status = model_loader.status()
+        message = (f"Model failed to load: {status['error']}" if status['state'] == 'failed'
+                   else "Model is still loading, please try again in a moment")
+        publish_placeholder(job, "-", message)
+        return
+    
+    queries = split_queries(query)
+    job.report("Collecting and scoring articles...")
+    if len(queries) > 1:
+        # Overlapping queries share articles: each distinct one is scored once, then fanned out
+        with track('collect_multi'):
+            frames, report = data_collector.collect_multi(
+                queries, max_results,
+                analyze=lambda df: sentiment_analyzer.analyze_dataframe(df, analyze_fn=inference_scheduler.analyze_batch)
+            )
+        # Each query's rows join its stored set as in a single-query run; those it lacked are archived
+        for q, f in frames.items():
+            if not f.empty:
+                data_collector.merge_scored(q, f, archive=lambda new, q=q: archive_scored(new, q))
+        frames = {q: compact_frame(f, drop_text=True) for q, f in frames.items()}
+        df = concat_frames(frames.values()) if report else pd.DataFrame()
+        if not df.empty:
+            df = df.drop_duplicates('url', ignore_index=True)
+    else:
+        frames, report = None, None
+        df = collect_and_score(sentiment_analyzer, query, max_results)
+    
+    if df.empty:
+        publish_placeholder(job, "0", "No data found")
+        return
+    
+    with track('summary_statistics'):
+        stats = sentiment_analyzer.get_summary_statistics(df)
+    job.publish('stats', stat_cards(stats))
+    # Figures are not rendered here: render_tab builds each one when its tab is first opened
+    job.publish('result', store_result(df, frames, report))
+
+
+def stat_cards(stats):
+    """Total / positive / neutral / negative card texts from summary statistics"""
+    return (
+        str(stats['total_items']),
+        f"{stats['positive_count']} ({stats['positive_ratio']:.1f}%)",
+        f"{stats['neutral_count']}",
+        f"{stats['negative_count']} ({stats['negative_ratio']:.1f}%)"
+    )
 
 
 def create_empty_figure():
@@ -342,11 +788,21 @@ def create_empty_figure():
     return fig
 
 
+CATEGORY_COLORS = {'Positive': '#27ae60', 'Neutral': '#f39c12', 'Negative': '#e74c3c'}
+
+# Above TIMELINE_MAX_POINTS articles the timeline is aggregated into about TIMELINE_BUCKETS time buckets
+TIMELINE_MAX_POINTS = int(os.getenv('TIMELINE_MAX_POINTS', 1000))
+TIMELINE_BUCKETS = int(os.getenv('TIMELINE_BUCKETS', 120))
+BUCKET_SIZES = ['1min', '5min', '15min', '30min', '1h', '3h', '6h', '12h', '1D', '7D']
+HISTOGRAM_BINS = 25
+
+
+@timed('pie_chart')
 def create_pie_chart(df):
     counts = df['sentiment_category'].value_counts()
-    colors = {'Positive': '#27ae60', 'Neutral': '#f39c12', 'Negative': '#e74c3c'}
+    counts = counts[counts > 0]
     fig = go.Figure(data=[go.Pie(labels=counts.index, values=counts.values, hole=0.4,
-                                 marker=dict(colors=[colors.get(label, '#95a5a6') for label in counts.index]),
+                                 marker=dict(colors=[CATEGORY_COLORS.get(label, '#95a5a6') for label in counts.index]),
                                  textposition='outside', textinfo='label+percent',
                                  textfont=dict(size=14, color='#2c3e50'))])
     fig.update_layout(title=dict(text="<b>Sentiment Distribution</b>", 
@@ -355,40 +811,150 @@ def create_pie_chart(df):
     return fig
 
 
-def create_timeline(df):
-    df_sorted = df.sort_values('created_at')
-    colors = {'Positive': '#27ae60', 'Neutral': '#f39c12', 'Negative': '#e74c3c'}
-    fig = px.scatter(df_sorted, x='created_at', y='sentiment', color='sentiment_category',
-                    color_discrete_map=colors, title="<b>Sentiment Timeline</b>")
-    fig.update_traces(marker=dict(size=10))
-    fig.update_layout(template="plotly_white", height=500, 
-                     title=dict(font=dict(size=22, color='#2c3e50'), x=0.5))
+def bucket_size(start, end):
+    """Smallest bucket width that keeps [start, end] within TIMELINE_BUCKETS buckets"""
+    span = end - start
+    for size in BUCKET_SIZES:
+        if span / pd.Timedelta(size) <= TIMELINE_BUCKETS:
+            return size
+    return BUCKET_SIZES[-1]
+
+
+@timed('timeline')
+def create_timeline(df, start=None, end=None, live=False):
+    """Per-article WebGL markers for small ranges, per-bucket mean and quartiles for large ones
+    
+    live keeps markers for the newest TIMELINE_MAX_POINTS articles with one trace per category
+    (empty or not), so live updates can append to fixed trace indices.
+    """
+    
+    if start is not None:
+        df = df[df['created_at'] >= start]
+    if end is not None:
+        df = df[df['created_at'] <= end]
+    if live:
+        df = df.nlargest(TIMELINE_MAX_POINTS, 'created_at')
+    
+    fig = go.Figure()
+    if len(df) <= TIMELINE_MAX_POINTS:
+        groups = dict(tuple(df.sort_values('created_at').groupby('sentiment_category', observed=True)))
+        for category in (CATEGORIES if live else groups):
+            group = groups.get(category, df.iloc[:0])
+            fig.add_trace(go.Scattergl(x=group['created_at'], y=group['sentiment'], mode='markers', name=category,
+                                       marker=dict(size=10, color=CATEGORY_COLORS.get(category))))
+        title = "<b>Sentiment Timeline</b>"
+    else:
+        size = bucket_size(df['created_at'].min(), df['created_at'].max())
+        grouped = df.groupby([pd.Grouper(key='created_at', freq=size), 'sentiment_category'], observed=True)['sentiment']
+        buckets = grouped.agg(['mean', 'count']).join(grouped.quantile([0.25, 0.75]).unstack())
+        
+        for category, group in buckets.groupby(level='sentiment_category', observed=True):
+            group = group.droplevel('sentiment_category')
+            fig.add_trace(go.Scattergl(
+                x=group.index, y=group['mean'], mode='lines+markers', name=category,
+                line=dict(color=CATEGORY_COLORS.get(category), width=1),
+                marker=dict(size=np.clip(np.sqrt(group['count'].to_numpy()) * 2, 4, 24),
+                            color=CATEGORY_COLORS.get(category)),
+                customdata=group[['count', 0.25, 0.75]].to_numpy(),
+                hovertemplate="%{x}<br>mean %{y:.2f} (IQR %{customdata[1]:.2f} to %{customdata[2]:.2f})"
+                              "<br>%{customdata[0]} articles<extra>" + str(category) + "</extra>"
+            ))
+        title = f"<b>Sentiment Timeline</b> ({len(df):,} articles, mean per {size})"
+    
+    fig.update_layout(template="plotly_white", height=500, title=dict(text=title, x=0.5, font=dict(size=22, color='#2c3e50')),
+                      xaxis_title="created_at", yaxis_title="sentiment", legend_title_text="sentiment_category")
     return fig
 
 
+@timed('histogram')
 def create_histogram(df):
-    fig = px.histogram(df, x='sentiment', nbins=25, color_discrete_sequence=['#3498db'],
-                      title="<b>Sentiment Score Distribution</b>")
-    fig.update_layout(template="plotly_white", height=500,
-                     title=dict(font=dict(size=22, color='#2c3e50'), x=0.5))
+    """Histogram binned server-side, so the payload is HISTOGRAM_BINS bars whatever the article count"""
+    counts, edges = np.histogram(df['sentiment'].dropna().to_numpy(), bins=HISTOGRAM_BINS, range=(-1, 1))
+    fig = go.Figure(go.Bar(x=(edges[:-1] + edges[1:]) / 2, y=counts, width=edges[1] - edges[0],
+                           marker_color='#3498db'))
+    fig.update_layout(template="plotly_white", height=500, bargap=0, xaxis_title="sentiment", yaxis_title="count",
+                     title=dict(text="<b>Sentiment Score Distribution</b>", font=dict(size=22, color='#2c3e50'), x=0.5))
     return fig
 
 
+@timed('comparison')
+def create_comparison(sentiment_analyzer, frames, report):
+    """Per-query sentiment mix and summary table, plus how much inference de-duplication saved"""
+    
+    stats = {query: sentiment_analyzer.get_summary_statistics(df) for query, df in frames.items()}
+    queries = [query for query in frames if stats[query]]
+    
+    fig = go.Figure()
+    for category in ['Positive', 'Neutral', 'Negative']:
+        key = f"{category.lower()}_count"
+        fig.add_trace(go.Bar(
+            x=queries, y=[stats[q][key] / stats[q]['total_items'] * 100 for q in queries], name=category,
+            marker_color=CATEGORY_COLORS[category], texttemplate="%{y:.0f}%", textposition='inside'
+        ))
+    fig.update_layout(barmode='stack', template="plotly_white", height=450, yaxis_title="% of articles",
+                      title=dict(text="<b>Sentiment by Query</b>", x=0.5, font=dict(size=22, color='#2c3e50')))
+    
+    rows = [html.Tr([html.Td(query), html.Td(s.get('total_items', 0)), html.Td(report['shared'].get(query, 0)),
+                     html.Td(f"{s['avg_sentiment']:.2f}" if s else "-"),
+                     html.Td(f"{s['positive_ratio']:.1f}%" if s else "-"),
+                     html.Td(f"{s['negative_ratio']:.1f}%" if s else "-")])
+            for query, s in stats.items()]
+    table = dbc.Table([html.Thead(html.Tr([html.Th(h) for h in ["Query", "Articles", "Shared with other queries",
+                                                                  "Avg sentiment", "Positive", "Negative"]])),
+                       html.Tbody(rows)], bordered=False, hover=True, size="sm")
+    
+    saved = html.P(
+        f"{report['articles']} articles across {report['queries']} queries, {report['unique_articles']} distinct "
+        f"({report['url_duplicates']} repeated URLs, {report['near_duplicates']} near-duplicate copies): "
+        f"inference ran on {report['unique_articles']} instead of {report['articles']} "
+        f"({report['inference_saved_pct']:.0f}% saved).",
+        style={'color': '#7f8c8d'}
+    )
+    return html.Div([dcc.Graph(figure=fig, config={'displayModeBar': False}), table, saved])
+
+
+@timed('wordcloud')
 def create_wordcloud(df):
-    text = ' '.join(df['text'].astype(str))
-    if not text:
+    # Scored frames carry the counted tokens instead of the full text (older stored rows may still have text)
+    texts = df['tokens'] if 'tokens' in df.columns else df['text']
+    if 'text' in df.columns:
+        texts = texts.fillna(df['text'])
+    image = wordcloud_renderer.render(texts.dropna().astype(str))
+    if image is None:
         return html.Div("No text data available", className="text-center")
-    wordcloud = WordCloud(width=1200, height=600, background_color='white', 
-                         colormap='viridis').generate(text)
-    img = BytesIO()
-    wordcloud.to_image().save(img, format='PNG')
-    img.seek(0)
-    encoded = base64.b64encode(img.read()).decode()
-    return html.Img(src=f"data:image/png;base64,{encoded}", style={'width': '100%', 'border-radius': '10px'})
+    return html.Img(src=image, style={'width': '100%', 'border-radius': '10px'})
+
+
+def prefetch_query(query, max_results, analyze_fn):
+    """Revalidate, collect and score a watched query as an Analyze click would, through the prefetcher's throttled analyze_fn"""
+    sentiment_analyzer = model_loader.wait()
+    if sentiment_analyzer is None:
+        raise RuntimeError(f"Model failed to load: {model_loader.status()['error']}")
+    return collect_and_score(sentiment_analyzer, query, max_results, analyze_fn=analyze_fn, refresh=True)
+
+
+# Watched queries are kept warm in the background, yielding to Analyze clicks and live mode
+prefetcher = WatchlistPrefetcher(
+    WATCHLIST_QUERIES if WATCHLIST_ENABLED else [],
+    collect_fn=prefetch_query,
+    analyze_fn=inference_scheduler.analyze_batch,
+    busy_fn=lambda: inference_scheduler.queue.qsize() > 0 or job_manager.active() > 0,
+    prerender_fn=create_wordcloud if WATCHLIST_PRERENDER else None,
+    prerender_results=WATCHLIST_PRERENDER_RESULTS,
+    max_results=WATCHLIST_MAX_RESULTS,
+    refresh_seconds=WATCHLIST_REFRESH_SECONDS,
+    concurrency=WATCHLIST_CONCURRENCY,
+    cpu_share=WATCHLIST_CPU_SHARE
+)
+# Interactive cache lookups for watched queries feed the prefetcher's hit rates and pre-render sizes
+data_collector.news.on_lookup = prefetcher.record_lookup
+if not RELOADER_WATCHER:
+    prefetcher.start()
 
 
 if __name__ == "__main__":
     port = int(os.getenv('PORT', 8050))
     host = os.getenv('HOST', '127.0.0.1')
+    configure_logging(os.getenv('LOG_LEVEL', 'INFO'))
     logger.info(f"🚀 Starting dashboard with authentication on http://{host}:{port}")
-    app.run_server(debug=True, host=host, port=port)
\ No newline at end of file
+    app.run_server(debug=DEBUG_MODE, host=host, port=port)
\ No newline at end of file
@@ -1,76 +1,272 @@
 """Data Collection Module"""
 
 import os
+import math
+import random
+import threading
 import time
-from datetime import datetime, timedelta
-from typing import List, Dict
-from newsapi import NewsApiClient
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from typing import List, Dict, Callable, Optional, Tuple
+import requests
+from requests.adapters import HTTPAdapter
 from loguru import logger
 from diskcache import Cache
+import numpy as np
 import pandas as pd
 from dotenv import load_dotenv
 
+from app.auth import load_config
+from app.dedup import near_duplicate_groups, article_texts
+from app.frames import bytes_per_row, compact_frame, concat_frames
+from app.metrics import track, CACHE_LOOKUPS, NEWS_API_REQUESTS, ARTICLES_COLLECTED, DEDUPLICATED_ARTICLES
+
 load_dotenv()
 cache = Cache('./data/cache')
 
+CACHE_CONFIG = load_config().get('cache', {})
+CACHE_ENABLED = os.getenv('CACHE_ENABLED', str(CACHE_CONFIG.get('enabled', True))).lower() == 'true'
+CACHE_TTL = int(os.getenv('CACHE_TTL', CACHE_CONFIG.get('ttl', 3600)))  # Fresh for this long
+CACHE_STALE_TTL = int(os.getenv('CACHE_STALE_TTL', CACHE_CONFIG.get('stale_ttl', 21600)))  # Then served stale while refreshing
+
+PAGE_SIZE = 100  # NewsAPI maximum page size
+WINDOW_DAYS = 7  # How far back searches (and persisted article sets) reach
+BACKFILL_MAX = int(os.getenv('NEWS_BACKFILL_MAX', 1000))  # Articles fetched at most to close a gap after the watermark
+
+
+def normalize_query(query: str) -> str:
+    """Canonical form of a query for cache keys"""
+    return ' '.join(str(query).lower().split())
+
+
+def window_start() -> datetime:
+    """Oldest publication time searches and stored sets reach, naive UTC like the articles' created_at"""
+    return datetime.now(timezone.utc).replace(tzinfo=None) - timedelta(days=WINDOW_DAYS)
+
+
 class NewsCollector:
     """Collects news articles"""
     
     def __init__(self):
         self.api_key = os.getenv('NEWS_API_KEY')
+        self.base_url = os.getenv('NEWS_API_URL', 'https://newsapi.org/v2').rstrip('/')
+        self.concurrency = int(os.getenv('NEWS_API_CONCURRENCY', 5))
+        self.max_retries = int(os.getenv('NEWS_API_MAX_RETRIES', 3))
+        self._refreshing = set()
+        self._refresh_lock = threading.Lock()
+        self.on_lookup = None  # Called with (query, max_results, cache, result) after each cache lookup
         if not self.api_key:
             logger.error("NEWS_API_KEY not found in .env file!")
-            self.client = None
+            self.session = None
         else:
-            self.client = NewsApiClient(api_key=self.api_key)
+            self.session = self._build_session()
             logger.info("News API client initialized")
     
+    def _build_session(self) -> requests.Session:
+        """Keep-alive session whose connection pool fits all concurrent page requests"""
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.concurrency)
+        session.mount('https://', adapter)
+        session.mount('http://', adapter)
+        session.headers['X-Api-Key'] = self.api_key
+        return session
+    
+    def _get_page(self, params: Dict, page: int) -> Dict:
+        """Fetch one page, backing off on rate limits and transient server errors"""
+        
+        for attempt in range(self.max_retries + 1):
+            with track('news_api_page'):
+                response = self.session.get(f"{self.base_url}/everything", params={**params, 'page': page}, timeout=30)
+            NEWS_API_REQUESTS.labels(response.status_code).inc()
+            
+            if response.status_code != 429 and response.status_code < 500:
+                response.raise_for_status()
+                return response.json()
+            
+            if attempt == self.max_retries:
+                response.raise_for_status()
+            
+            retry_after = response.headers.get('Retry-After')
+            delay = float(retry_after) if retry_after and retry_after.isdigit() else 2 ** attempt + random.random()
+            logger.warning(f"News API returned {response.status_code} for page {page}, retrying in {delay:.1f}s")
+            time.sleep(delay)
+    
+    def _fetch_pages(self, params: Dict, pages: int) -> List[Dict]:
+        """Fetch pages 1..pages concurrently; only a failed first page is fatal"""
+        
+        with ThreadPoolExecutor(max_workers=max(1, min(pages, self.concurrency))) as pool:
+            futures = [pool.submit(self._get_page, params, page) for page in range(1, pages + 1)]
+        
+        responses = []
+        for page, future in enumerate(futures, start=1):
+            try:
+                responses.append(future.result())
+            except Exception as e:
+                if page == 1:
+                    raise
+                logger.warning(f"Skipping page {page}: {e}")
+        return responses
+    
     def search_news(self, query: str, max_results: int = 50) -> List[Dict]:
-        """Search news articles"""
+        """Search news articles, answered from the cache while fresh (stale entries are served and refreshed)"""
         
-        if not self.client:
+        if not self.session:
             logger.error("News API client not initialized")
             return []
         
-        cache_key = f"news_{query}_{max_results}"
-        cached = cache.get(cache_key)
-        if cached:
-            logger.info(f"Returning {len(cached)} cached articles")
-            return cached
-        
-        try:
-            from_date = (datetime.now() - timedelta(days=7)).strftime('%Y-%m-%d')
+        with track('news_search'):
+            cache_key = f"news_{normalize_query(query)}"
+            entry = None
+            if CACHE_ENABLED:
+                with track('news_cache_lookup'):
+                    entry = cache.get(cache_key)
             
-            logger.info(f"Searching news for: {query}")
-            response = self.client.get_everything(
-                q=query,
-                from_param=from_date,
-                language='en',
-                sort_by='publishedAt',
-                page_size=min(max_results, 100)
-            )
+            if entry is not None and self._covers(entry, max_results):
+                stale = time.time() - entry['fetched_at'] >= CACHE_TTL
+                self.report_lookup(query, max_results, 'news', 'stale' if stale else 'hit')
+                if stale:
+                    self._revalidate(query, max(max_results, entry['max_results']))
+                articles = entry['articles'][:max_results]
+                logger.info(f"Returning {len(articles)} cached articles" + (" (stale, refreshing)" if stale else ""))
+                return articles
             
-            if not response.get('articles'):
-                logger.warning(f"No articles found for: {query}")
-                return []
+            if CACHE_ENABLED:
+                self.report_lookup(query, max_results, 'news', 'miss')
             
-            articles = []
-            for article in response['articles']:
-                articles.append({
-                    'title': article['title'],
-                    'text': article.get('description', '') or article.get('content', ''),
-                    'created_at': datetime.strptime(article['publishedAt'], '%Y-%m-%dT%H:%M:%SZ'),
-                    'source': f"news_{article['source']['name']}",
-                    'url': article['url']
-                })
+            try:
+                with track('news_fetch'):
+                    articles, exhausted = self._fetch(query, max_results)
+            except Exception as e:
+                logger.error(f"Error fetching news: {e}")
+                return []
             
-            cache.set(cache_key, articles, expire=3600)
-            logger.info(f"Collected {len(articles)} articles")
+            if CACHE_ENABLED:
+                self._store(cache_key, articles, max_results, exhausted)
             return articles
-            
-        except Exception as e:
-            logger.error(f"Error fetching news: {e}")
-            return []
+    
+    def fetch_since(self, query: str, since: datetime, max_results: int) -> Tuple[List[Dict], bool]:
+        """Uncached fetch of up to max_results articles published at or after `since`; returns (articles, complete)"""
+        
+        if not self.session:
+            return [], False
+        with track('news_fetch'):
+            return self._fetch(query, max_results, since)
+    
+    def report_lookup(self, query: str, max_results: int, cache_name: str, result: str):
+        CACHE_LOOKUPS.labels(cache_name, result).inc()
+        if self.on_lookup is not None:
+            self.on_lookup(query, max_results, cache_name, result)
+    
+    @staticmethod
+    def _covers(entry: Dict, max_results: int) -> bool:
+        """A cached fetch answers any smaller request, and any request once the query ran out of articles"""
+        return entry['max_results'] >= max_results or entry['exhausted']
+    
+    @staticmethod
+    def _store(cache_key: str, articles: List[Dict], max_results: int, exhausted: bool):
+        # Empty results are stored too: they are valid negative-cache entries
+        cache.set(cache_key, {
+            'articles': articles,
+            'max_results': max_results,
+            'exhausted': exhausted,
+            'fetched_at': time.time()
+        }, expire=CACHE_TTL + CACHE_STALE_TTL)
+    
+    def refresh(self, query: str, max_results: int):
+        """Fetch a query now and re-cache it, restarting its TTL
+        
+        A cached entry is topped up with the articles published since its newest one, which is
+        usually a single short page instead of a full search.
+        """
+        
+        cache_key = f"news_{normalize_query(query)}"
+        entry = cache.get(cache_key) if CACHE_ENABLED else None
+        if not entry or not entry['articles'] or not self._covers(entry, max_results):
+            articles, exhausted = self._fetch(query, max_results)
+            self._store(cache_key, articles, max_results, exhausted)
+            return
+        
+        max_results = max(max_results, entry['max_results'])
+        newest = max(article['created_at'] for article in entry['articles'])
+        articles, complete = self._fetch(query, max_results, since=newest)
+        if complete:
+            # Cut off means these are already the newest max_results; otherwise the cached ones follow
+            urls = {article['url'] for article in articles}
+            cutoff = window_start()
+            articles += [article for article in entry['articles']
+                         if article['url'] not in urls and article['created_at'] >= cutoff]
+        self._store(cache_key, articles[:max_results], max_results,
+                    complete and entry['exhausted'] and len(articles) <= max_results)
+    
+    def _revalidate(self, query: str, max_results: int):
+        """Refresh a stale entry in the background, at most once per query at a time"""
+        
+        key = normalize_query(query)
+        with self._refresh_lock:
+            if key in self._refreshing:
+                return
+            self._refreshing.add(key)
+        
+        def refresh():
+            try:
+                self.refresh(query, max_results)
+            except Exception as e:
+                logger.warning(f"Background refresh failed for '{key}': {e}")
+            finally:
+                with self._refresh_lock:
+                    self._refreshing.discard(key)
+        
+        threading.Thread(target=refresh, name='news-refresh', daemon=True).start()
+    
+    def _fetch(self, query: str, max_results: int, since: Optional[datetime] = None):
+        """Fetch articles from the API; returns (articles, exhausted)"""
+        
+        from_date = (window_start() if since is None else since).strftime('%Y-%m-%dT%H:%M:%S')
+        
+        logger.info(f"Searching news for: {query}")
+        params = {
+            'q': query,
+            'from': from_date,
+            'language': 'en',
+            'sortBy': 'publishedAt',
+            'pageSize': min(max_results, PAGE_SIZE)
+        }
+        pages = math.ceil(max_results / PAGE_SIZE)
+        if since is None:
+            responses = self._fetch_pages(params, pages)
+            # A skipped page leaves the result short without the search being exhausted
+            complete = len(responses) == pages
+        else:
+            complete = True
+            # Usually a single short page: only page on while pages come back full
+            responses = []
+            for page in range(1, pages + 1):
+                responses.append(self._get_page(params, page))
+                if len(responses[-1].get('articles') or []) < params['pageSize']:
+                    break
+        raw = [a for response in responses for a in response.get('articles') or []]
+        
+        articles = []
+        seen_urls = set()
+        for article in raw:
+            if article['url'] in seen_urls:
+                continue
+            seen_urls.add(article['url'])
+            articles.append({
+                'title': article['title'],
+                'text': article.get('description', '') or article.get('content', ''),
+                'created_at': datetime.strptime(article['publishedAt'], '%Y-%m-%dT%H:%M:%SZ'),
+                'source': f"news_{article['source']['name']}",
+                'url': article['url']
+            })
+        
+        articles = articles[:max_results]
+        ARTICLES_COLLECTED.inc(len(articles))
+        if not articles:
+            logger.warning(f"No articles found for: {query}")
+        else:
+            logger.info(f"Collected {len(articles)} articles")
+        return articles, complete and len(raw) < max_results
 
 
 class DataCollector:
@@ -78,6 +274,8 @@ class DataCollector:
     
     def __init__(self):
         self.news = NewsCollector()
+        self._query_locks = {}
+        self._locks_guard = threading.Lock()
     
     def collect_data(self, query: str, max_results: int = 50) -> pd.DataFrame:
         """Collect data from news"""
@@ -88,12 +286,191 @@ class DataCollector:
             logger.warning("No data collected")
             return pd.DataFrame()
         
-        df = pd.DataFrame(articles)
-        df['query'] = query
-        df['collected_at'] = datetime.now()
+        df = compact_frame(pd.DataFrame(articles), query=query, collected_at=datetime.now())
         
         logger.info(f"Total items collected: {len(df)}")
         return df
+    
+    def _query_lock(self, key: str) -> threading.Lock:
+        with self._locks_guard:
+            return self._query_locks.setdefault(key, threading.Lock())
+    
+    def collect_incremental(self, query: str, max_results: int = 50,
+                            analyze: Optional[Callable[[pd.DataFrame], pd.DataFrame]] = None,
+                            poll: bool = False, refresh: bool = False) -> pd.DataFrame:
+        """Merge the query's latest articles into its persisted set, scoring only the ones not seen before
+        
+        Articles come from the cached search, so repeat requests make no API call while it is fresh.
+        A larger max_results than before fetches (and adds) older articles too. The watermark marks how
+        far the set is complete: when the search no longer reaches back to it, the articles published
+        since are fetched page by page, and if that is cut off at BACKFILL_MAX the watermark stays put so
+        the gap is not hidden. With poll (live mode) only articles since the watermark are fetched,
+        bypassing the cache; with refresh (prefetch) the cached search is revalidated first, restarting
+        its TTL.
+        
+        `analyze` is applied to the new rows only; stored rows keep the columns it added.
+        Returns the newest max_results rows of the merged set.
+        """
+        
+        key = normalize_query(query)
+        with self._query_lock(key):
+            state = cache.get(f"articles_{key}")
+            stored = state['articles'] if state else pd.DataFrame()
+            since = state['watermark'] if state else None
+            
+            complete = True
+            if poll and since is not None:
+                articles, complete = self._fetch_since(query, since)
+            else:
+                if refresh:
+                    self.news.refresh(query, max_results)
+                articles = self.news.search_news(query, max_results)
+                if since is not None and articles and min(a['created_at'] for a in articles) > since:
+                    # More was published since the watermark than the search returns: page back to it
+                    backfill, complete = self._fetch_since(query, since)
+                    articles = articles + backfill
+            
+            # One boundary for what counts as new and what the merge keeps, so nothing is re-scored on every call
+            cutoff = window_start()
+            new = pd.DataFrame(articles)
+            if not new.empty:
+                new = new.drop_duplicates('url', ignore_index=True)
+                new = new[new['created_at'] >= cutoff]
+            if not new.empty and not stored.empty:
+                new = new[~new['url'].isin(stored['url'])]
+            if not poll:
+                # A hit when every article was already scored and stored
+                self.news.report_lookup(query, max_results, 'articles', 'miss' if not new.empty else 'hit')
+            
+            if not new.empty:
+                new = compact_frame(new, query=query, collected_at=datetime.now())
+                if analyze is not None:
+                    new = analyze(new)
+            
+            merged = self._merge(stored, new, cutoff)
+            logger.info(f"Incremental refresh for '{key}': {len(new)} new, {len(stored)} stored"
+                        + (f" (watermark {since})" if since else "")
+                        + (f", {bytes_per_row(merged):,.0f} bytes/row" if not merged.empty else ""))
+            if merged.empty:
+                return merged
+            
+            watermark = since
+            if complete and not merged.empty:
+                watermark = merged['created_at'].max().to_pydatetime()
+            elif not complete:
+                logger.warning(f"Articles for '{key}' after {since} are incomplete; keeping the watermark")
+            if not new.empty or len(merged) != len(stored) or watermark != since:
+                cache.set(f"articles_{key}", {'watermark': watermark, 'articles': merged})
+            
+            return merged.head(max_results).copy()
+    
+    def merge_scored(self, query: str, df: pd.DataFrame,
+                     archive: Optional[Callable[[pd.DataFrame], pd.DataFrame]] = None) -> pd.DataFrame:
+        """Add already scored rows (from collect_multi) to the query's persisted set, as collect_incremental would
+        
+        `archive` is applied to the rows the set did not hold yet, and its result is what gets stored.
+        The watermark is only set for a new set: a search need not reach back to an existing one, and
+        the next collect_incremental fills any gap. Returns the rows that were new.
+        """
+        
+        key = normalize_query(query)
+        with self._query_lock(key):
+            state = cache.get(f"articles_{key}")
+            stored = state['articles'] if state else pd.DataFrame()
+            cutoff = window_start()
+            new = df[df['created_at'] >= cutoff]
+            if not stored.empty:
+                new = new[~new['url'].isin(stored['url'])]
+            if new.empty:
+                return new
+            
+            merged = self._merge(stored, archive(new) if archive is not None else new, cutoff)
+            watermark = state['watermark'] if state else merged['created_at'].max().to_pydatetime()
+            cache.set(f"articles_{key}", {'watermark': watermark, 'articles': merged})
+            logger.info(f"Merged {len(new)} scored rows into the stored set for '{key}' ({len(merged)} rows)")
+            return new
+    
+    @staticmethod
+    def _merge(stored: pd.DataFrame, new: pd.DataFrame, cutoff: datetime) -> pd.DataFrame:
+        """Stored and new rows published since cutoff (window_start), newest first"""
+        
+        # Stored sets from before the compact representation are converted on their next merge
+        merged = concat_frames([stored, new]) if not new.empty else stored
+        if merged.empty:
+            return merged
+        merged = merged[merged['created_at'] >= cutoff]
+        return merged.sort_values('created_at', ascending=False, ignore_index=True)
+    
+    def _fetch_since(self, query: str, since: datetime) -> Tuple[List[Dict], bool]:
+        try:
+            return self.news.fetch_since(query, since, BACKFILL_MAX)
+        except Exception as e:
+            logger.error(f"Error fetching news since {since}: {e}")
+            return [], False
+    
+    def collect_multi(self, queries: List[str], max_results: int = 50,
+                      analyze: Optional[Callable[[pd.DataFrame], pd.DataFrame]] = None,
+                      near_duplicate_threshold: float = 0.8) -> Tuple[Dict[str, pd.DataFrame], Dict]:
+        """Collect several queries concurrently and score each distinct article once
+        
+        Articles are de-duplicated across queries by URL, then by MinHash near-duplicate text
+        (syndicated copies). `analyze` runs on one representative per group and its columns are
+        copied to every duplicate. Returns the per-query frames and a de-duplication report.
+        """
+        
+        with ThreadPoolExecutor(max_workers=max(1, min(len(queries), self.news.concurrency))) as pool:
+            results = list(pool.map(lambda query: self.news.search_news(query, max_results), queries))
+        
+        collected_at = datetime.now()
+        frames = [pd.DataFrame(articles).assign(query=query, collected_at=collected_at)
+                  for query, articles in zip(queries, results) if articles]
+        if not frames:
+            logger.warning("No data collected")
+            return {query: pd.DataFrame() for query in queries}, {}
+        combined = pd.concat(frames, ignore_index=True)
+        
+        # Row -> distinct URL -> representative URL whose text stands in for its near-duplicates
+        url_codes, _ = pd.factorize(combined['url'])
+        first_rows = np.unique(url_codes, return_index=True)[1]
+        unique = combined.iloc[first_rows].reset_index(drop=True)
+        groups = near_duplicate_groups(article_texts(unique['title'], unique['text']), near_duplicate_threshold)
+        representatives, group_codes = np.unique(groups, return_inverse=True)
+        row_groups = group_codes[url_codes]
+        
+        scored = unique.iloc[representatives].reset_index(drop=True)
+        if analyze is not None:
+            scored = analyze(scored)
+        added = [column for column in scored.columns if column not in combined.columns]
+        
+        report = {
+            'queries': len(queries),
+            'articles': len(combined),
+            'unique_urls': len(unique),
+            'unique_articles': len(scored),
+            'url_duplicates': len(combined) - len(unique),
+            'near_duplicates': len(unique) - len(scored),
+            'inference_saved': len(combined) - len(scored),
+            'inference_saved_pct': (len(combined) - len(scored)) / len(combined) * 100,
+            'shared': {}
+        }
+        DEDUPLICATED_ARTICLES.labels('url').inc(report['url_duplicates'])
+        DEDUPLICATED_ARTICLES.labels('near').inc(report['near_duplicates'])
+        
+        group_queries = pd.Series(combined['query'].to_numpy()).groupby(row_groups).nunique()
+        frames = {}
+        for query in queries:
+            mask = (combined['query'] == query).to_numpy()
+            df = combined[mask].reset_index(drop=True)
+            for column in added:
+                df[column] = scored[column].take(row_groups[mask]).reset_index(drop=True)
+            frames[query] = compact_frame(df)
+            report['shared'][query] = int((group_queries.to_numpy()[row_groups[mask]] > 1).sum())
+        
+        logger.info(f"Multi-query collection of {len(queries)} queries: {report['articles']} articles, "
+                    f"{report['unique_articles']} unique ({report['url_duplicates']} same URL, "
+                    f"{report['near_duplicates']} near-duplicate); inference saved on "
+                    f"{report['inference_saved_pct']:.1f}%")
+        return frames, report
 
 
 if __name__ == "__main__":
@@ -0,0 +1,76 @@
+"""Near-duplicate Detection Module"""
+
+import re
+import zlib
+from typing import List, Sequence
+import numpy as np
+
+TOKEN_PATTERN = re.compile(r"\w+")
+PRIME = (1 << 31) - 1  # Shingle hashes are reduced below this so a * x + b fits in uint64
+
+
+def shingles(text: str, size: int = 3) -> np.ndarray:
+    """Hashes of the word n-grams of a text (the whole text if it is shorter than one n-gram)"""
+    words = TOKEN_PATTERN.findall(str(text).lower())
+    grams = [' '.join(words[i:i + size]) for i in range(max(len(words) - size + 1, 1))]
+    return np.fromiter((zlib.crc32(gram.encode('utf-8')) % PRIME for gram in grams), dtype=np.uint64, count=len(grams))
+
+
+def minhash_signatures(texts: Sequence[str], num_perm: int = 64, seed: int = 0) -> np.ndarray:
+    """(len(texts), num_perm) MinHash signatures; equal columns estimate Jaccard similarity of shingle sets"""
+    rng = np.random.default_rng(seed)
+    a = rng.integers(1, PRIME, size=(num_perm, 1), dtype=np.uint64)
+    b = rng.integers(0, PRIME, size=(num_perm, 1), dtype=np.uint64)
+
+    signatures = np.empty((len(texts), num_perm), dtype=np.uint64)
+    for row, text in enumerate(texts):
+        signatures[row] = ((a * shingles(text)[np.newaxis, :] + b) % PRIME).min(axis=1)
+    return signatures
+
+
+def near_duplicate_groups(texts: Sequence[str], threshold: float = 0.8, num_perm: int = 64,
+                          bands: int = 16) -> np.ndarray:
+    """Index of each text's representative: the first text it is (transitively) a near-duplicate of
+
+    Candidate pairs come from LSH banding of the MinHash signatures and are confirmed when the
+    estimated Jaccard similarity reaches threshold. Texts without a near-duplicate map to themselves.
+    """
+
+    count = len(texts)
+    parent = np.arange(count)
+    if count < 2:
+        return parent
+
+    def find(i: int) -> int:
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    signatures = minhash_signatures(texts, num_perm)
+    rows = num_perm // bands
+    for band in range(bands):
+        buckets = {}
+        for i, key in enumerate(map(bytes, signatures[:, band * rows:(band + 1) * rows])):
+            buckets.setdefault(key, []).append(i)
+
+        for members in buckets.values():
+            first = members[0]
+            for other in members[1:]:
+                root_first, root_other = find(first), find(other)
+                if root_first == root_other:
+                    continue
+                if np.mean(signatures[first] == signatures[other]) >= threshold:
+                    # The earlier text stays the representative
+                    parent[max(root_first, root_other)] = min(root_first, root_other)
+
+    return np.array([find(i) for i in range(count)])
+
+
+def duplicate_count(groups: np.ndarray) -> int:
+    return int(np.count_nonzero(groups != np.arange(len(groups))))
+
+
+def article_texts(titles: Sequence, texts: Sequence) -> List[str]:
+    """What near-duplicate detection compares: syndicated copies share headline and body"""
+    return [f"{title or ''} {text or ''}" for title, text in zip(titles, texts)]
@@ -0,0 +1,102 @@
+"""Compact Frame Module
+
+Article/sentiment frames are held per query (collection state, live mode, API responses), so
+their representation is kept small:
+
+- repeated labels (source, sentiment label/category/stage) are categoricals
+- scores are float32
+- title, url and text are Arrow-backed strings
+- per-batch metadata that is the same on every row (query, collected_at) lives in df.attrs;
+  it only becomes a (categorical) column when rows of different batches are combined
+- once scored, full text can be replaced by the word cloud's tokens
+"""
+
+from typing import Iterable
+import numpy as np
+import pandas as pd
+
+METADATA_COLUMNS = ['query', 'collected_at']
+CATEGORY_COLUMNS = ['source', 'sentiment_label', 'sentiment_category', 'sentiment_stage']
+FLOAT_COLUMNS = ['sentiment_score', 'sentiment']
+STRING_COLUMNS = ['title', 'text', 'url', 'tokens']
+STRING_DTYPE = pd.StringDtype('pyarrow')
+
+
+def compact_frame(df: pd.DataFrame, drop_text: bool = False, **metadata) -> pd.DataFrame:
+    """Copy of df in the compact representation; keyword arguments are stored as per-frame metadata
+
+    drop_text replaces `text` with `tokens`, the words the word cloud counts (stopwords and
+    numbers removed), which is all that needs it once sentiment is scored.
+    """
+
+    attrs = {**df.attrs, **metadata}
+    df = df.copy(deep=False)
+    df.attrs = {}
+
+    for column in METADATA_COLUMNS:
+        if column not in df.columns:
+            continue
+        values = df[column]
+        if len(df) and values.nunique(dropna=False) == 1:
+            attrs[column] = values.iloc[0]
+            df = df.drop(columns=column)
+        else:
+            df[column] = values.astype('category')
+
+    if drop_text and 'text' in df.columns:
+        from app.wordcloud_renderer import token_string
+        df['tokens'] = [token_string(text) if isinstance(text, str) else None for text in df['text']]
+        df = df.drop(columns='text')
+
+    for column in df.columns.intersection(CATEGORY_COLUMNS):
+        if not isinstance(df[column].dtype, pd.CategoricalDtype):
+            df[column] = df[column].astype('category')
+    for column in df.columns.intersection(FLOAT_COLUMNS):
+        df[column] = df[column].astype(np.float32)
+    for column in df.columns.intersection(STRING_COLUMNS):
+        if df[column].dtype != STRING_DTYPE:
+            df[column] = df[column].astype(STRING_DTYPE)
+
+    df.attrs = attrs
+    return df
+
+
+def expand_metadata(df: pd.DataFrame) -> pd.DataFrame:
+    """Copy of df with its per-frame metadata as ordinary columns (for writers and row-wise merges)"""
+
+    df = df.copy(deep=False)
+    attrs = dict(df.attrs)
+    for column in METADATA_COLUMNS:
+        if column in attrs and column not in df.columns:
+            df[column] = pd.Categorical.from_codes(np.zeros(len(df), dtype=np.int8), categories=[attrs.pop(column)])
+    df.attrs = attrs
+    return df
+
+
+def concat_frames(frames: Iterable[pd.DataFrame]) -> pd.DataFrame:
+    """Concatenate compact frames, keeping categoricals categorical and metadata per row where it differs"""
+
+    frames = [expand_metadata(df) for df in frames if not df.empty]
+    if not frames:
+        return pd.DataFrame()
+
+    # pd.concat falls back to object dtype unless categoricals share their categories
+    columns = list(dict.fromkeys(column for df in frames for column in df.columns))
+    for column in columns:
+        if any(isinstance(df[column].dtype, pd.CategoricalDtype) for df in frames if column in df.columns):
+            categories = pd.Index(pd.unique(np.concatenate([
+                np.asarray(df[column].cat.categories if isinstance(df[column].dtype, pd.CategoricalDtype)
+                           else df[column].dropna().unique(), dtype=object)
+                for df in frames if column in df.columns
+            ])))
+            dtype = pd.CategoricalDtype(categories)
+            frames = [df.assign(**{column: df[column].astype(dtype)}) if column in df.columns else df
+                      for df in frames]
+
+    return compact_frame(pd.concat(frames, ignore_index=True))
+
+
+def bytes_per_row(df: pd.DataFrame) -> float:
+    """Deep memory usage per row, including string payloads"""
+    return float(df.memory_usage(deep=True, index=True).sum()) / max(len(df), 1)
+
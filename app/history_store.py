@@ -0,0 +1,143 @@
+"""Article History Store Module"""
+
+import os
+import threading
+import uuid
+from datetime import datetime
+from typing import List, Optional
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+from loguru import logger
+
+from app.data_collector import normalize_query
+from app.frames import expand_metadata
+
+SCHEMA = pa.schema([
+    ('title', pa.string()),
+    ('text', pa.string()),
+    ('created_at', pa.timestamp('us')),
+    ('source', pa.string()),
+    ('url', pa.string()),
+    ('query', pa.string()),
+    ('collected_at', pa.timestamp('us')),
+    ('sentiment_label', pa.string()),
+    ('sentiment_score', pa.float64()),
+    ('sentiment', pa.float64()),
+    ('sentiment_category', pa.string()),
+    ('sentiment_stage', pa.string()),
+])
+
+PARTITIONING = ds.partitioning(
+    pa.schema([('query_key', pa.string()), ('date', pa.string())]), flavor='hive'
+)
+# A partition is compacted into one file once appends leave it with this many (0 never compacts)
+COMPACT_FILES = int(os.getenv('HISTORY_COMPACT_FILES', 20))
+
+
+class HistoryStore:
+    """Parquet store of collected articles and their sentiment, partitioned by query and date"""
+    
+    def __init__(self, root: str = './data/history', compact_files: int = COMPACT_FILES):
+        self.root = root
+        self.compact_files = compact_files
+        self._compact_lock = threading.Lock()
+        os.makedirs(self.root, exist_ok=True)
+    
+    def write(self, df: pd.DataFrame, query: str):
+        """Append analyzed rows for a query, compacting the partitions that reach compact_files files"""
+        
+        if df.empty:
+            return
+        
+        df = expand_metadata(df)
+        data = {}
+        for field in SCHEMA:
+            column = df[field.name] if field.name in df.columns else pd.Series([None] * len(df))
+            data[field.name] = pa.array(column, from_pandas=True).cast(field.type, safe=False)
+        data['query_key'] = pa.array([normalize_query(query)] * len(df), pa.string())
+        data['date'] = pa.array(pd.to_datetime(df['created_at']).dt.strftime('%Y-%m-%d'), pa.string())
+        
+        written = []
+        ds.write_dataset(
+            pa.table(data), self.root, format='parquet', partitioning=PARTITIONING,
+            basename_template=f"part-{uuid.uuid4().hex}-{{i}}.parquet",
+            existing_data_behavior='overwrite_or_ignore',
+            file_visitor=lambda file: written.append(file.path)
+        )
+        logger.debug(f"Wrote {len(df)} rows to history for '{query}'")
+        
+        if self.compact_files > 0:
+            for directory in {os.path.dirname(path) for path in written}:
+                if len(self._files(directory)) >= self.compact_files:
+                    self._compact_partition(directory)
+    
+    def dataset(self) -> ds.Dataset:
+        return ds.dataset(self.root, format='parquet', partitioning=PARTITIONING,
+                          schema=pa.unify_schemas([SCHEMA, PARTITIONING.schema]))
+    
+    def _filter(self, query: Optional[str], start: Optional[datetime], end: Optional[datetime]):
+        # Conditions on the partition columns prune whole directories before any file is opened
+        conditions = []
+        if query is not None:
+            conditions.append(ds.field('query_key') == normalize_query(query))
+        if start is not None:
+            conditions.append(ds.field('date') >= start.strftime('%Y-%m-%d'))
+            conditions.append(ds.field('created_at') >= pa.scalar(start, pa.timestamp('us')))
+        if end is not None:
+            conditions.append(ds.field('date') <= end.strftime('%Y-%m-%d'))
+            conditions.append(ds.field('created_at') < pa.scalar(end, pa.timestamp('us')))
+        
+        expression = None
+        for condition in conditions:
+            expression = condition if expression is None else expression & condition
+        return expression
+    
+    def read_table(self, query: Optional[str] = None, start: Optional[datetime] = None,
+                   end: Optional[datetime] = None, columns: Optional[List[str]] = None,
+                   filter: Optional[ds.Expression] = None) -> pa.Table:
+        """Arrow table for [start, end) with column projection and predicate pushdown"""
+        
+        expression = self._filter(query, start, end)
+        if filter is not None:
+            expression = filter if expression is None else expression & filter
+        return self.dataset().to_table(columns=columns, filter=expression)
+    
+    def read(self, query: Optional[str] = None, start: Optional[datetime] = None,
+             end: Optional[datetime] = None, columns: Optional[List[str]] = None,
+             filter: Optional[ds.Expression] = None) -> pd.DataFrame:
+        """Same as read_table, converted to pandas"""
+        return self.read_table(query, start, end, columns, filter).to_pandas()
+    
+    def compact(self, query: str):
+        """Rewrite a query's partitions as one file per date (many small appends add up)"""
+        
+        fragments = self.dataset().get_fragments(filter=ds.field('query_key') == normalize_query(query))
+        for directory in sorted({os.path.dirname(fragment.path) for fragment in fragments}):
+            self._compact_partition(directory)
+    
+    @staticmethod
+    def _files(directory: str) -> List[str]:
+        return sorted(os.path.join(directory, name) for name in os.listdir(directory) if name.endswith('.parquet'))
+    
+    def _compact_partition(self, directory: str):
+        """Merge a partition directory's files into one
+        
+        Only the files listed up front are replaced, so appends landing meanwhile are kept. The merged
+        file is in place before they are removed: a concurrent read may briefly see rows twice, never
+        lose them.
+        """
+        
+        with self._compact_lock:
+            paths = self._files(directory)
+            if len(paths) < 2:
+                return
+            table = ds.dataset(paths, format='parquet', schema=SCHEMA).to_table()
+            name = f"part-{uuid.uuid4().hex}-0.parquet"
+            # Dot-prefixed while being written, so dataset discovery skips it
+            pq.write_table(table, os.path.join(directory, f".{name}.tmp"))
+            os.replace(os.path.join(directory, f".{name}.tmp"), os.path.join(directory, name))
+            for path in paths:
+                os.remove(path)
+        logger.info(f"Compacted {len(paths)} history files ({table.num_rows} rows) in {directory}")
@@ -0,0 +1,105 @@
+"""Micro-batching Inference Scheduler Module"""
+
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Callable, Dict, List
+from loguru import logger
+
+
+class InferenceScheduler:
+    """Merges analyze requests from concurrent callbacks into shared batches on one worker"""
+    
+    def __init__(self, analyze_fn: Callable[[List[str]], List[Dict]],
+                 max_batch_size: int = 128, max_wait_ms: float = 10):
+        self.analyze_fn = analyze_fn
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self.queue = queue.Queue()
+        self.lock = threading.Lock()
+        self.worker = None
+        
+        self.requests = 0
+        self.batches = 0
+        self.texts = 0
+        self.fill_total = 0.0
+        self.max_queue_depth = 0
+    
+    def analyze_batch(self, texts: List[str]) -> List[Dict]:
+        """Queue texts for the next shared batch and block until their results are ready"""
+        
+        if not texts:
+            return []
+        
+        self._ensure_worker()
+        future = Future()
+        self.queue.put((list(texts), future))
+        with self.lock:
+            self.max_queue_depth = max(self.max_queue_depth, self.queue.qsize())
+        return future.result()
+    
+    def _ensure_worker(self):
+        with self.lock:
+            if self.worker is None:
+                self.worker = threading.Thread(target=self._run, name='inference-scheduler', daemon=True)
+                self.worker.start()
+    
+    def _collect(self) -> List:
+        """Take one request, then keep merging until the batch is full or max_wait passes"""
+        
+        pending = [self.queue.get()]
+        size = len(pending[0][0])
+        deadline = time.monotonic() + self.max_wait
+        
+        while size < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                request = self.queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            pending.append(request)
+            size += len(request[0])
+        
+        return pending
+    
+    def _run(self):
+        while True:
+            pending = self._collect()
+            texts = [text for request_texts, _ in pending for text in request_texts]
+            
+            try:
+                results = self.analyze_fn(texts)
+            except Exception as e:
+                logger.error(f"Scheduled batch of {len(texts)} texts failed: {e}")
+                for _, future in pending:
+                    future.set_exception(e)
+                continue
+            
+            offset = 0
+            for request_texts, future in pending:
+                future.set_result(results[offset:offset + len(request_texts)])
+                offset += len(request_texts)
+            
+            with self.lock:
+                self.requests += len(pending)
+                self.batches += 1
+                self.texts += len(texts)
+                self.fill_total += min(len(texts) / self.max_batch_size, 1.0)
+            logger.debug(f"Scheduled batch: {len(pending)} requests, {len(texts)} texts, "
+                         f"{self.queue.qsize()} still queued")
+    
+    def stats(self) -> Dict:
+        """Queue depth and batch fill metrics"""
+        with self.lock:
+            return {
+                'queue_depth': self.queue.qsize(),
+                'max_queue_depth': self.max_queue_depth,
+                'requests': self.requests,
+                'batches': self.batches,
+                'texts': self.texts,
+                'avg_requests_per_batch': self.requests / self.batches if self.batches else 0.0,
+                'avg_batch_fill': self.fill_total / self.batches if self.batches else 0.0
+            }
@@ -0,0 +1,134 @@
+"""Background Job Module"""
+
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Hashable, Optional
+from loguru import logger
+
+
+class Job:
+    """A pipeline run whose stage results become visible as soon as each stage finishes"""
+    
+    def __init__(self, key: Hashable):
+        self.id = uuid.uuid4().hex
+        self.key = key
+        self.status = 'running'  # running -> done | failed
+        self.error = None
+        self.progress = 'Queued'
+        self.stages = {}
+        self.created_at = time.time()
+        self.finished_at = None
+        self.lock = threading.Lock()
+    
+    def publish(self, stage: str, value: Any):
+        """Make a stage result available to pollers"""
+        with self.lock:
+            self.stages[stage] = value
+    
+    def report(self, progress: str):
+        self.progress = progress
+    
+    def snapshot(self) -> Dict:
+        with self.lock:
+            return {
+                'status': self.status,
+                'error': self.error,
+                'progress': self.progress,
+                'stages': dict(self.stages)
+            }
+
+
+class JobManager:
+    """Runs jobs on a local thread pool; identical in-flight jobs are collapsed into one"""
+    
+    def __init__(self, max_workers: int = 4, keep_seconds: float = 600):
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='job')
+        self.keep_seconds = keep_seconds
+        self.jobs = {}
+        self.inflight = {}
+        self.lock = threading.Lock()
+    
+    def submit(self, key: Hashable, fn: Callable[[Job], None]) -> Job:
+        """Start fn(job) unless a job with the same key is still running, in which case return that one"""
+        
+        with self.lock:
+            self._purge()
+            running = self.inflight.get(key)
+            if running is not None:
+                logger.info(f"Joining in-flight job {running.id} for {key}")
+                return running
+            
+            job = Job(key)
+            self.jobs[job.id] = job
+            self.inflight[key] = job
+        
+        self.executor.submit(self._run, job, fn)
+        return job
+    
+    def _run(self, job: Job, fn: Callable[[Job], None]):
+        try:
+            # Every log line emitted while the job runs carries its ID
+            with logger.contextualize(trace_id=job.id[:12]):
+                fn(job)
+            job.status = 'done'
+        except Exception as e:
+            logger.error(f"Job {job.id} failed: {e}")
+            job.error = str(e)
+            job.status = 'failed'
+        finally:
+            job.finished_at = time.time()
+            with self.lock:
+                if self.inflight.get(job.key) is job:
+                    del self.inflight[job.key]
+    
+    def active(self) -> int:
+        """Number of jobs still running"""
+        with self.lock:
+            return len(self.inflight)
+    
+    def get(self, job_id: str) -> Optional[Job]:
+        with self.lock:
+            return self.jobs.get(job_id)
+    
+    def _purge(self):
+        cutoff = time.time() - self.keep_seconds
+        for job_id in [i for i, job in self.jobs.items() if job.finished_at and job.finished_at < cutoff]:
+            del self.jobs[job_id]
+
+
+class ResultStore:
+    """Finished analysis results by ID, so views can be rendered on demand; least recently used are evicted"""
+    
+    def __init__(self, max_results: int = 32):
+        self.max_results = max_results
+        self.results = OrderedDict()
+        self.lock = threading.Lock()
+    
+    def put(self, result: Dict) -> str:
+        result_id = uuid.uuid4().hex
+        with self.lock:
+            self.results[result_id] = {**result, 'views': {}}
+            while len(self.results) > self.max_results:
+                self.results.popitem(last=False)
+        return result_id
+    
+    def get(self, result_id: str) -> Optional[Dict]:
+        with self.lock:
+            result = self.results.get(result_id)
+            if result is not None:
+                self.results.move_to_end(result_id)
+            return result
+    
+    def view(self, result_id: str, name: str, render: Callable[[Dict], Any]) -> Any:
+        """A named view of a result, rendered on first request and reused after; None if the result expired"""
+        
+        result = self.get(result_id)
+        if result is None:
+            return None
+        views = result['views']
+        if name not in views:
+            views[name] = render(result)
+        return views[name]
@@ -0,0 +1,81 @@
+"""Pipeline Metrics Module"""
+
+import sys
+import time
+from functools import wraps
+from contextlib import contextmanager
+from prometheus_client import Counter, Gauge, Histogram, CONTENT_TYPE_LATEST, generate_latest
+from loguru import logger
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+STAGE_SECONDS = Histogram(
+    'sentiment_stage_seconds', 'Latency of pipeline stages', ['stage'], buckets=LATENCY_BUCKETS
+)
+CACHE_LOOKUPS = Counter(
+    'sentiment_cache_lookups_total', 'Cache lookups by cache and outcome', ['cache', 'result']
+)
+NEWS_API_REQUESTS = Counter(
+    'sentiment_news_api_requests_total', 'News API page requests by HTTP status', ['status']
+)
+ARTICLES_COLLECTED = Counter('sentiment_articles_collected_total', 'Articles returned by the News API')
+TEXTS_ANALYZED = Counter(
+    'sentiment_texts_analyzed_total', 'Texts passed to analyze_batch, by where the result came from', ['source']
+)
+MODEL_BATCH_TEXTS = Histogram(
+    'sentiment_model_batch_texts', 'Texts per model forward pass',
+    buckets=(1, 2, 4, 8, 16, 32, 64, 128, 256)
+)
+MODEL_BATCH_TOKENS = Histogram(
+    'sentiment_model_batch_tokens', 'Padded tokens per model forward pass',
+    buckets=(64, 128, 256, 512, 1024, 2048, 4096, 8192, 16384)
+)
+DEDUPLICATED_ARTICLES = Counter(
+    'sentiment_deduplicated_articles_total', 'Articles scored once on behalf of a duplicate, by duplicate kind', ['kind']
+)
+SCHEDULER_QUEUE_DEPTH = Gauge('sentiment_scheduler_queue_depth', 'Requests waiting for the inference scheduler')
+PREFETCH_REFRESHES = Counter('sentiment_prefetch_refreshes_total', 'Watchlist refreshes by outcome', ['result'])
+WATCHLIST_LOOKUPS = Counter(
+    'sentiment_watchlist_lookups_total', 'Interactive cache lookups for watched queries, by cache and outcome',
+    ['query', 'cache', 'result']
+)
+
+# Log lines carry the trace ID of the job that emitted them ("-" outside of jobs)
+LOG_FORMAT = ("<green>{time:YYYY-MM-DD HH:mm:ss.SSS}</green> | <level>{level: <8}</level> | "
+              "<magenta>{extra[trace_id]}</magenta> | <cyan>{name}</cyan>:<cyan>{line}</cyan> - <level>{message}</level>")
+
+logger.configure(extra={'trace_id': '-'})
+
+
+def configure_logging(level: str = 'INFO'):
+    """Replace loguru's default sink with one that shows trace IDs"""
+    logger.remove()
+    logger.add(sys.stderr, level=level, format=LOG_FORMAT)
+
+
+@contextmanager
+def track(stage: str):
+    """Observe the duration of a block under a stage label, and log it at debug level"""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        STAGE_SECONDS.labels(stage).observe(elapsed)
+        logger.debug(f"{stage} took {elapsed * 1000:.1f}ms")
+
+
+def timed(stage: str):
+    """Decorator form of track()"""
+    def decorator(fn):
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            with track(stage):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def metrics_response():
+    """Body and content type of the Prometheus exposition for this process"""
+    return generate_latest(), CONTENT_TYPE_LATEST
@@ -0,0 +1,222 @@
+"""Watchlist Prefetch Module"""
+
+import multiprocessing
+import os
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Iterable, List, Optional
+import pandas as pd
+from loguru import logger
+
+from app.auth import load_config
+from app.data_collector import normalize_query, CACHE_TTL
+from app.metrics import track, PREFETCH_REFRESHES, WATCHLIST_LOOKUPS
+
+WATCHLIST_CONFIG = load_config().get('watchlist') or {}
+WATCHLIST_ENABLED = os.getenv('WATCHLIST_ENABLED', str(WATCHLIST_CONFIG.get('enabled', False))).lower() == 'true'
+# ';'-separated in the environment, like multi-query searches
+WATCHLIST_QUERIES = [q.strip() for q in os.getenv('WATCHLIST_QUERIES', ';'.join(WATCHLIST_CONFIG.get('queries') or [])).split(';')
+                     if q.strip()]
+WATCHLIST_MAX_RESULTS = int(os.getenv('WATCHLIST_MAX_RESULTS', WATCHLIST_CONFIG.get('max_results', 100)))
+# Refresh before the cached search expires (CACHE_TTL), so watched queries never go cold
+WATCHLIST_REFRESH_SECONDS = float(os.getenv('WATCHLIST_REFRESH_SECONDS',
+                                            WATCHLIST_CONFIG.get('refresh_seconds', CACHE_TTL * 0.75)))
+WATCHLIST_CONCURRENCY = int(os.getenv('WATCHLIST_CONCURRENCY', WATCHLIST_CONFIG.get('concurrency', 1)))
+WATCHLIST_CPU_SHARE = float(os.getenv('WATCHLIST_CPU_SHARE', WATCHLIST_CONFIG.get('cpu_share', 0.25)))
+WATCHLIST_PRERENDER = os.getenv('WATCHLIST_PRERENDER', str(WATCHLIST_CONFIG.get('prerender', True))).lower() == 'true'
+# Result counts pre-rendered before any are requested (40 is the dashboard's default)
+WATCHLIST_PRERENDER_RESULTS = [int(n) for n in os.getenv(
+    'WATCHLIST_PRERENDER_RESULTS', ','.join(str(n) for n in WATCHLIST_CONFIG.get('prerender_results', [40]))
+).split(',') if n.strip()]
+
+TICK_SECONDS = 5
+RETRY_SECONDS = 300  # After a failed refresh
+
+
+class WatchlistPrefetcher:
+    """Refreshes watched queries in the background so interactive requests find warm caches
+
+    Every refresh_seconds (set below the cache TTL) each query's cached search is revalidated and
+    the query is collected and scored the way an Analyze click would (collect_fn). The word cloud
+    (prerender_fn) is then rendered for each result count users ask for: the configured
+    prerender_results plus the counts most requested for that query. At most `concurrency` queries
+    refresh at once, and together they use about `cpu_share` of wall time: texts are scored in
+    chunk_size pieces with proportional pauses in between, and scoring waits while busy_fn reports
+    interactive work.
+
+    Hit rates come from the interactive requests' own cache lookups (record_lookup), not from the
+    prefetcher's.
+    """
+
+    def __init__(self, queries: Iterable[str], collect_fn: Callable[[str, int, Callable], pd.DataFrame],
+                 analyze_fn: Callable[[List[str]], List[Dict]], busy_fn: Callable[[], bool],
+                 prerender_fn: Optional[Callable[[pd.DataFrame], object]] = None,
+                 prerender_results: Iterable[int] = (40,), learned_results: int = 3, max_results: int = 100,
+                 refresh_seconds: float = 2700, concurrency: int = 1, cpu_share: float = 0.25,
+                 chunk_size: int = 32, max_yield_seconds: float = 30):
+        self.queries = {normalize_query(q): q.strip() for q in queries if q and q.strip()}
+        self.collect_fn = collect_fn
+        self.analyze_fn = analyze_fn
+        self.busy_fn = busy_fn
+        self.prerender_fn = prerender_fn
+        self.prerender_results = list(prerender_results)
+        self.learned_results = learned_results
+        self.max_results = max_results
+        self.refresh_seconds = refresh_seconds
+        self.concurrency = max(1, concurrency)
+        self.cpu_share = min(max(cpu_share, 0.01), 1.0)
+        self.chunk_size = chunk_size
+        self.max_yield_seconds = max_yield_seconds
+
+        self.next_due = dict.fromkeys(self.queries, 0.0)
+        self.refreshed_at = {}
+        self.running = set()
+        self.lookups = {key: {} for key in self.queries}  # cache -> result -> count
+        self.requested = {key: Counter() for key in self.queries}  # max_results -> interactive requests
+        self.local = threading.local()
+        self.refreshes = 0
+        self.failures = 0
+        self.lock = threading.Lock()
+        self.stopped = threading.Event()
+        self.pool = None
+        self.thread = None
+
+    def start(self):
+        """Start the scheduler thread (no-op without watched queries, or if already started)"""
+        if not self.queries or multiprocessing.parent_process() is not None:
+            return
+
+        with self.lock:
+            if self.thread is not None:
+                return
+            self.pool = ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix='prefetch')
+            self.thread = threading.Thread(target=self._loop, name='prefetch-scheduler', daemon=True)
+            self.thread.start()
+        logger.info(f"Prefetching {len(self.queries)} watched queries every {self.refresh_seconds:.0f}s "
+                    f"({self.concurrency} at a time, ~{self.cpu_share:.0%} CPU)")
+
+    def stop(self):
+        self.stopped.set()
+        if self.pool is not None:
+            self.pool.shutdown(wait=False, cancel_futures=True)
+
+    def _loop(self):
+        while not self.stopped.is_set():
+            for key in self.due():
+                self.pool.submit(self.refresh, key)
+            self.stopped.wait(TICK_SECONDS)
+
+    def due(self, now: Optional[float] = None) -> List[str]:
+        """Watched queries whose refresh is due and not already running; marks them running"""
+        now = time.time() if now is None else now
+        with self.lock:
+            keys = [key for key, due in self.next_due.items() if due <= now and key not in self.running]
+            self.running.update(keys)
+        return keys
+
+    def refresh(self, key: str):
+        """Revalidate, collect, score and pre-render one watched query"""
+
+        query = self.queries[key]
+        started = time.perf_counter()
+        self.local.prefetching = True
+        with logger.contextualize(trace_id=f"prefetch-{key[:20]}"):
+            try:
+                with track('prefetch'):
+                    sizes = self.prerender_sizes(key) if self.prerender_fn is not None else []
+                    # Every pre-rendered count is a prefix of this collection, as it is of an interactive one
+                    df = self.collect_fn(query, max([self.max_results, *sizes]), self.throttle(self.analyze_fn))
+                    if not df.empty:
+                        for size in sizes:
+                            self.prerender_fn(df.head(size))
+
+                with self.lock:
+                    self.refreshed_at[key] = time.time()
+                    self.next_due[key] = time.time() + self.refresh_seconds
+                    self.refreshes += 1
+                PREFETCH_REFRESHES.labels('ok').inc()
+                logger.info(f"Prefetched '{query}': {len(df)} articles, pre-rendered {sizes} "
+                            f"in {time.perf_counter() - started:.1f}s")
+            except Exception as e:
+                with self.lock:
+                    self.next_due[key] = time.time() + min(RETRY_SECONDS, self.refresh_seconds)
+                    self.failures += 1
+                PREFETCH_REFRESHES.labels('failed').inc()
+                logger.warning(f"Prefetch of '{query}' failed: {e}")
+            finally:
+                self.local.prefetching = False
+                with self.lock:
+                    self.running.discard(key)
+
+    def prerender_sizes(self, key: str) -> List[int]:
+        """Configured result counts plus the ones most requested for this query"""
+        with self.lock:
+            requested = [size for size, _ in self.requested[key].most_common(self.learned_results)]
+        return sorted(set(self.prerender_results) | set(requested))
+
+    def throttle(self, analyze_fn: Callable[[List[str]], List[Dict]]) -> Callable[[List[str]], List[Dict]]:
+        """analyze_fn in chunk_size pieces, pausing after each to stay within this worker's CPU share"""
+
+        duty = self.cpu_share / self.concurrency
+
+        def analyze(texts: List[str]) -> List[Dict]:
+            results = []
+            for start in range(0, len(texts), self.chunk_size):
+                self._yield_to_interactive()
+                chunk_started = time.perf_counter()
+                results.extend(analyze_fn(texts[start:start + self.chunk_size]))
+                # Working t seconds then idling t * (1 - duty) / duty keeps this worker at `duty`
+                self.stopped.wait((time.perf_counter() - chunk_started) * (1 - duty) / duty)
+            return results
+
+        return analyze
+
+    def _yield_to_interactive(self):
+        deadline = time.monotonic() + self.max_yield_seconds
+        while self.busy_fn() and time.monotonic() < deadline and not self.stopped.is_set():
+            self.stopped.wait(0.1)
+
+    def record_lookup(self, query: str, max_results: int, cache: str, result: str):
+        """Count an interactive cache lookup for a watched query (the news collector's on_lookup hook)"""
+
+        if getattr(self.local, 'prefetching', False):
+            return
+        key = normalize_query(query)
+        if key not in self.queries:
+            return
+        with self.lock:
+            counts = self.lookups[key].setdefault(cache, {})
+            counts[result] = counts.get(result, 0) + 1
+            if cache == 'articles':
+                # One per collection, so this counts requests by size
+                self.requested[key][max_results] += 1
+        WATCHLIST_LOOKUPS.labels(key, cache, result).inc()
+
+    def stats(self) -> Dict:
+        """Refresh counts and, per cache, interactive hit rates overall and per watched query"""
+
+        def rates(lookups):
+            return {cache: {**dict(counts), 'hit_rate': round(counts.get('hit', 0) / sum(counts.values()), 3)}
+                    for cache, counts in lookups.items()}
+
+        now = time.time()
+        with self.lock:
+            totals = {}
+            for lookups in self.lookups.values():
+                for cache, counts in lookups.items():
+                    totals.setdefault(cache, Counter()).update(counts)
+            per_query = {
+                key: {'refreshed_seconds_ago': round(now - self.refreshed_at[key]) if key in self.refreshed_at else None,
+                      'lookups': rates(self.lookups[key])}
+                for key in self.queries
+            }
+            return {
+                'queries': len(self.queries),
+                'refreshes': self.refreshes,
+                'failures': self.failures,
+                'running': sorted(self.running),
+                'lookups': rates(totals),
+                'per_query': per_query
+            }
@@ -0,0 +1,92 @@
+"""Process Pool Inference Module"""
+
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, Iterator, List
+from loguru import logger
+
+# Each worker process loads its own analyzer once, in _init_worker
+_worker_analyzer = None
+
+
+def _init_worker(threads: int, backend: str):
+    global _worker_analyzer
+    import os
+    import torch
+    torch.set_num_interop_threads(1)
+    # Explicit, so the worker's analyzer does not apply the single-process autotuned thread count
+    os.environ['INFERENCE_THREADS'] = str(threads)
+    
+    from app.sentiment_analyzer import SentimentAnalyzer
+    _worker_analyzer = SentimentAnalyzer(backend=backend)
+
+
+def _analyze_chunk(texts: List[str]) -> List[Dict]:
+    return _worker_analyzer.analyze_batch(texts)
+
+
+class ProcessPoolAnalyzer:
+    """Splits large analyze jobs across worker processes with a fixed torch thread count each"""
+    
+    def __init__(self, workers: int, threads_per_worker: int = 1, chunk_size: int = 256,
+                 max_retries: int = 2, backend: str = None):
+        self.workers = workers
+        self.threads_per_worker = threads_per_worker
+        self.chunk_size = chunk_size
+        self.max_retries = max_retries
+        self.backend = backend
+        self.pool = None
+    
+    def _get_pool(self) -> ProcessPoolExecutor:
+        if self.pool is None:
+            logger.info(f"Starting inference pool: {self.workers} workers x {self.threads_per_worker} threads")
+            self.pool = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context('spawn'),
+                initializer=_init_worker,
+                initargs=(self.threads_per_worker, self.backend)
+            )
+        return self.pool
+    
+    def _restart(self):
+        if self.pool is not None:
+            self.pool.shutdown(wait=False, cancel_futures=True)
+            self.pool = None
+        return self._get_pool()
+    
+    def analyze_iter(self, texts: List[str]) -> Iterator[Dict]:
+        """Yield results in input order as chunks finish, retrying chunks lost to worker crashes"""
+        
+        chunks = [texts[i:i + self.chunk_size] for i in range(0, len(texts), self.chunk_size)]
+        pool = self._get_pool()
+        futures = [pool.submit(_analyze_chunk, chunk) for chunk in chunks]
+        attempts = [0] * len(chunks)
+        
+        for i in range(len(chunks)):
+            while True:
+                try:
+                    results = futures[i].result()
+                    break
+                except BrokenProcessPool:
+                    attempts[i] += 1
+                    if attempts[i] > self.max_retries:
+                        raise
+                    logger.warning(f"Inference worker crashed, retrying from chunk {i} "
+                                   f"(attempt {attempts[i]}/{self.max_retries})")
+                    
+                    pool = self._restart()
+                    for j in range(i, len(chunks)):
+                        if not futures[j].done() or futures[j].exception() is not None:
+                            futures[j] = pool.submit(_analyze_chunk, chunks[j])
+            
+            yield from results
+    
+    def analyze_batch(self, texts: List[str]) -> List[Dict]:
+        """Same contract as SentimentAnalyzer.analyze_batch"""
+        return list(self.analyze_iter(texts)) if texts else []
+    
+    def shutdown(self):
+        if self.pool is not None:
+            self.pool.shutdown()
+            self.pool = None
@@ -1,24 +1,229 @@
 """Sentiment Analysis Module"""
 
 import os
-import torch
-from transformers import pipeline
-from typing import List, Dict
+import threading
+import time
+from collections import OrderedDict
+from typing import List, Dict, Iterable, Callable, Optional, Tuple
+import numpy as np
 import pandas as pd
 from loguru import logger
 from diskcache import Cache
 import hashlib
 
+from app.batching import plan_batches, pad_batch
+from app.cascade import LexicalScorer, split_confident
+from app.metrics import track, timed, CACHE_LOOKUPS, TEXTS_ANALYZED, MODEL_BATCH_TEXTS, MODEL_BATCH_TOKENS
+
 cache = Cache('./data/cache')
 
+CATEGORIES = ['Negative', 'Neutral', 'Positive']
+CATEGORY_THRESHOLD = 0.2
+# Settings autotune can choose, and the environment variables that override them
+TUNING_ENV = {'threads': 'INFERENCE_THREADS', 'batch_size': 'BATCH_SIZE', 'max_batch_tokens': 'MAX_BATCH_TOKENS'}
+
+
+def normalize_text(text) -> str:
+    """Collapse whitespace and truncate text the way it is fed to the model"""
+    if not text:
+        return ""
+    return ' '.join(str(text).split())[:512]
+
+
+def results_to_arrays(results: List[Dict]) -> Tuple[pd.Categorical, np.ndarray, np.ndarray]:
+    """Columnar view of analyze_batch results: labels, scores and signed sentiment"""
+    count = len(results)
+    labels = pd.Categorical([r['label'] for r in results])
+    scores = np.fromiter((r['score'] for r in results), dtype=np.float64, count=count)
+    sentiment = np.fromiter((r['sentiment'] for r in results), dtype=np.float64, count=count)
+    return labels, scores, sentiment
+
+
+def category_codes(sentiment: np.ndarray) -> np.ndarray:
+    """Index into CATEGORIES: > 0.2 Positive, < -0.2 Negative, otherwise (including NaN) Neutral"""
+    codes = (sentiment > CATEGORY_THRESHOLD).astype(np.int8) + (sentiment >= -CATEGORY_THRESHOLD)
+    codes[np.isnan(sentiment)] = 1
+    return codes
+
+
+def categorize(sentiment: np.ndarray) -> pd.Categorical:
+    return pd.Categorical.from_codes(category_codes(sentiment), categories=CATEGORIES)
+
+
+class SentimentAggregate:
+    """Mergeable running summary of sentiment values, updated batch by batch"""
+    
+    def __init__(self):
+        self.total = 0
+        self.scored = 0
+        self.sentiment_sum = 0.0
+        self.counts = np.zeros(len(CATEGORIES), dtype=np.int64)
+    
+    def update(self, sentiment: np.ndarray) -> 'SentimentAggregate':
+        sentiment = np.asarray(sentiment, dtype=np.float64)
+        self.total += len(sentiment)
+        self.scored += int(np.count_nonzero(~np.isnan(sentiment)))
+        self.sentiment_sum += float(np.nansum(sentiment))
+        self.counts += np.bincount(category_codes(sentiment), minlength=len(CATEGORIES))
+        return self
+    
+    def merge(self, other: 'SentimentAggregate') -> 'SentimentAggregate':
+        merged = SentimentAggregate()
+        merged.total = self.total + other.total
+        merged.scored = self.scored + other.scored
+        merged.sentiment_sum = self.sentiment_sum + other.sentiment_sum
+        merged.counts = self.counts + other.counts
+        return merged
+    
+    def to_state(self) -> Dict:
+        """JSON-serializable running state, restored by from_state"""
+        return {'total': self.total, 'scored': self.scored,
+                'sentiment_sum': self.sentiment_sum, 'counts': self.counts.tolist()}
+    
+    @classmethod
+    def from_state(cls, state: Dict) -> 'SentimentAggregate':
+        aggregate = cls()
+        aggregate.total = state['total']
+        aggregate.scored = state['scored']
+        aggregate.sentiment_sum = state['sentiment_sum']
+        aggregate.counts += np.asarray(state['counts'], dtype=np.int64)
+        return aggregate
+    
+    def to_dict(self) -> Dict:
+        """Same keys as SentimentAnalyzer.get_summary_statistics"""
+        if not self.total:
+            return {}
+        negative, neutral, positive = (int(c) for c in self.counts)
+        return {
+            'total_items': self.total,
+            'positive_count': positive,
+            'negative_count': negative,
+            'neutral_count': neutral,
+            'avg_sentiment': self.sentiment_sum / self.scored if self.scored else float('nan'),
+            'positive_ratio': positive / self.total * 100,
+            'negative_ratio': negative / self.total * 100
+        }
+
+
+def apply_results(df: pd.DataFrame, results: List[Dict]) -> pd.DataFrame:
+    """Attach sentiment columns from analyze_batch results to a frame"""
+    labels, scores, sentiment = results_to_arrays(results)
+    df['sentiment_label'] = labels
+    df['sentiment_score'] = scores
+    df['sentiment'] = sentiment
+    df['sentiment_category'] = categorize(sentiment)
+    df['sentiment_stage'] = pd.Categorical([r.get('stage', 'transformer') for r in results])
+    return df
+
+
+class ResultCache:
+    """Two-tier sentiment result cache: in-process LRU in front of diskcache"""
+    
+    def __init__(self, directory: str = './data/cache/sentiment', memory_size: int = 10000,
+                 disk_size_limit: int = 256 * 1024 * 1024):
+        self.memory_size = memory_size
+        self.memory = OrderedDict()
+        self.disk = Cache(directory, size_limit=disk_size_limit,
+                          eviction_policy='least-recently-used')
+        self.lock = threading.Lock()
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+    
+    @staticmethod
+    def make_key(text: str, model_name: str) -> str:
+        """Content address for a normalized text scored by a given model"""
+        return hashlib.sha256(f"{model_name}\x00{text}".encode('utf-8')).hexdigest()
+    
+    def get_many(self, keys: Iterable[str]) -> Dict[str, Dict]:
+        """Look up keys, promoting disk hits into memory"""
+        found = {}
+        for key in keys:
+            with self.lock:
+                result = self.memory.get(key)
+                if result is not None:
+                    self.memory.move_to_end(key)
+                    self.memory_hits += 1
+                    CACHE_LOOKUPS.labels('result_memory', 'hit').inc()
+                    found[key] = result
+                    continue
+            
+            result = self.disk.get(key)
+            with self.lock:
+                if result is None:
+                    self.misses += 1
+                    CACHE_LOOKUPS.labels('result_disk', 'miss').inc()
+                    continue
+                self.disk_hits += 1
+                CACHE_LOOKUPS.labels('result_disk', 'hit').inc()
+                self._remember(key, result)
+            found[key] = result
+        return found
+    
+    def set_many(self, items: Dict[str, Dict]):
+        """Store results in both tiers"""
+        with self.lock:
+            for key, result in items.items():
+                self._remember(key, result)
+        for key, result in items.items():
+            self.disk.set(key, result)
+    
+    def _remember(self, key: str, result: Dict):
+        self.memory[key] = result
+        self.memory.move_to_end(key)
+        while len(self.memory) > self.memory_size:
+            self.memory.popitem(last=False)
+    
+    def stats(self) -> Dict:
+        """Hit/miss counters and current sizes"""
+        with self.lock:
+            hits = self.memory_hits + self.disk_hits
+            lookups = hits + self.misses
+            return {
+                'memory_hits': self.memory_hits,
+                'disk_hits': self.disk_hits,
+                'misses': self.misses,
+                'hit_ratio': hits / lookups if lookups else 0.0,
+                'memory_items': len(self.memory),
+                'disk_bytes': self.disk.volume()
+            }
+
+
+def cascade_weights_path(model_cache_dir: str, model_name: str) -> str:
+    """Where the distilled lexical scorer for a model lives (CASCADE_WEIGHTS overrides)"""
+    from app.backends import artifact_dir
+    return os.getenv('CASCADE_WEIGHTS') or os.path.join(artifact_dir(model_cache_dir, model_name), 'lexical.npz')
+
+
 class SentimentAnalyzer:
     """Sentiment analyzer using DistilBERT"""
     
-    def __init__(self):
+    def __init__(self, backend: str = None):
+        # Heavy imports are deferred so importing this module stays cheap
+        import torch
+        from transformers import AutoTokenizer
+        from app.backends import load_backend
+        
         self.model_name = os.getenv('MODEL_NAME', 'distilbert-base-uncased-finetuned-sst-2-english')
+        self.backend_name = backend or os.getenv('INFERENCE_BACKEND', 'torch')
         self.device = 0 if torch.cuda.is_available() else -1
-        self.batch_size = int(os.getenv('BATCH_SIZE', 10))
+        self.batch_size = int(os.getenv('BATCH_SIZE', 64))  # Upper bound on texts per batch
+        self.max_batch_tokens = int(os.getenv('MAX_BATCH_TOKENS', 4096))  # Padded tokens per batch
+        self.threads = int(os.getenv('INFERENCE_THREADS', 0))  # Intra-op threads (0 = framework default)
+        self.tuner = None
+        self.max_length = 512
         self.model_cache_dir = './models'  # Store models in project folder
+        self.workers = int(os.getenv('INFERENCE_WORKERS', 0))  # Opt-in process pool for large frames
+        self.pool_min_rows = int(os.getenv('POOL_MIN_ROWS', 2000))
+        self.pool = None
+        # Cascade: texts the lexical scorer is at least this confident about skip the model (0 = off)
+        self.cascade_threshold = float(os.getenv('CASCADE_THRESHOLD', 0))
+        self.cascade = None
+        self.result_cache = ResultCache(
+            directory=os.getenv('RESULT_CACHE_DIR', './data/cache/sentiment'),
+            memory_size=int(os.getenv('RESULT_CACHE_SIZE', 10000)),
+            disk_size_limit=int(os.getenv('RESULT_CACHE_DISK_MB', 256)) * 1024 * 1024
+        )
         
         # Create models directory if it doesn't exist
         os.makedirs(self.model_cache_dir, exist_ok=True)
@@ -26,53 +231,136 @@ class SentimentAnalyzer:
         logger.info(f"Loading model: {self.model_name}")
         logger.info(f"Model cache directory: {self.model_cache_dir}")
         logger.info(f"Device: {'GPU' if self.device == 0 else 'CPU'}")
+        logger.info(f"Inference backend: {self.backend_name}")
         
         try:
-            self.pipeline = pipeline(
-                "sentiment-analysis",
-                model=self.model_name,
-                device=self.device,
-                truncation=True,
-                max_length=512,
-                model_kwargs={'cache_dir': self.model_cache_dir}
-            )
+            self.tokenizer = AutoTokenizer.from_pretrained(self.model_name, cache_dir=self.model_cache_dir)
+            self.backend = load_backend(self.backend_name, self.model_name, self.model_cache_dir, self.device)
+            self._apply_tuning()
+            if self.cascade_threshold:
+                self.cascade = self._load_cascade()
             logger.info("✅ Model loaded successfully")
         except Exception as e:
             logger.error(f"❌ Error loading model: {e}")
             raise
     
+    def _apply_tuning(self):
+        """Saved autotune settings for this model and backend, except those set explicitly in the environment"""
+        from app.autotune import RuntimeTuner, load_tuning, tuning_path
+        
+        tuning = load_tuning(tuning_path(self.model_cache_dir, self.model_name), self.backend_name) or {}
+        for name, env in TUNING_ENV.items():
+            if name in tuning and os.getenv(env) is None:
+                setattr(self, name, tuning[name])
+        if tuning:
+            logger.info(f"Autotuned settings: {self.threads} threads, batch {self.batch_size}, "
+                        f"{self.max_batch_tokens} tokens")
+        if self.threads:
+            self.backend.set_threads(self.threads)
+        
+        if os.getenv('AUTOTUNE_RUNTIME', 'false').lower() == 'true':
+            self.tuner = RuntimeTuner(self, max_batch_ms=float(os.getenv('AUTOTUNE_MAX_BATCH_MS', 0)))
+    
+    def apply_setting(self, name: str, value: int):
+        """Change threads, batch_size or max_batch_tokens on the loaded model"""
+        if name not in TUNING_ENV:
+            raise ValueError(f"Unknown setting '{name}', expected one of {sorted(TUNING_ENV)}")
+        setattr(self, name, value)
+        if name == 'threads':
+            self.backend.set_threads(value)
+    
+    @timed('analyze_batch')
     def analyze_batch(self, texts: List[str]) -> List[Dict]:
-        """Analyze multiple texts"""
+        """Analyze multiple texts, running the model only on uncached ones"""
         
         if not texts:
             return []
         
-        results = []
-        
         try:
-            for i in range(0, len(texts), self.batch_size):
-                batch = texts[i:i + self.batch_size]
-                batch = [str(text)[:512] if text else "" for text in batch]
-                
-                batch_results = self.pipeline(batch)
-                
-                for result in batch_results:
-                    sentiment_score = result['score'] if result['label'] == 'POSITIVE' else -result['score']
-                    
-                    results.append({
-                        'label': result['label'],
-                        'score': result['score'],
-                        'sentiment': sentiment_score
-                    })
+            texts = [normalize_text(text) for text in texts]
+            keys = [self.result_cache.make_key(text, f"{self.model_name}:{self.backend_name}") for text in texts]
+            
+            with track('result_cache_lookup'):
+                results = self.result_cache.get_many(dict.fromkeys(keys))
+            pending = {}
+            for key, text in zip(keys, texts):
+                if key not in results:
+                    pending.setdefault(key, text)
             
-            return results
+            inferred = {}
+            if pending:
+                fresh = dict(zip(pending, self._score_uncached(list(pending.values()))))
+                # Only model results are cached; lexical ones are cheaper to recompute than to store
+                inferred = {key: result for key, result in fresh.items() if result['stage'] == 'transformer'}
+                self.result_cache.set_many(inferred)
+                results.update(fresh)
+            
+            TEXTS_ANALYZED.labels('cache').inc(len(texts) - len(pending))
+            TEXTS_ANALYZED.labels('lexical').inc(len(pending) - len(inferred))
+            TEXTS_ANALYZED.labels('model').inc(len(inferred))
+            logger.debug(f"Result cache: {len(texts) - len(pending)} cached, {len(pending) - len(inferred)} lexical, "
+                         f"{len(inferred)} inferred")
+            # Entries cached before results carried a stage all came from the model
+            return [{**results[key], 'stage': results[key].get('stage', 'transformer')} for key in keys]
             
         except Exception as e:
             logger.error(f"Error in batch processing: {e}")
-            return [{'label': 'NEUTRAL', 'score': 0.0, 'sentiment': 0.0}] * len(texts)
+            return [{'label': 'NEUTRAL', 'score': 0.0, 'sentiment': 0.0, 'stage': 'fallback'}] * len(texts)
+    
+    def _load_cascade(self) -> LexicalScorer:
+        """Distilled lexical scorer from CASCADE_WEIGHTS (or this model's artifacts), else the seed lexicon"""
+        path = cascade_weights_path(self.model_cache_dir, self.model_name)
+        if os.path.exists(path):
+            logger.info(f"Cascade: lexical scorer from {path}, threshold {self.cascade_threshold}")
+            return LexicalScorer.load(path)
+        logger.info(f"Cascade: seed lexicon scorer, threshold {self.cascade_threshold}")
+        return LexicalScorer()
     
-    def analyze_dataframe(self, df: pd.DataFrame, text_column: str = 'text') -> pd.DataFrame:
-        """Analyze sentiment for DataFrame"""
+    def _score_uncached(self, texts: List[str], threshold: Optional[float] = None) -> List[Dict]:
+        """Score texts without the result cache: lexical stage first when the cascade is on, the model for the rest"""
+        
+        threshold = self.cascade_threshold if threshold is None else threshold
+        if self.cascade is None or not threshold:
+            return self._run_model(texts)
+        
+        results, uncertain = split_confident(self.cascade, texts, threshold)
+        if uncertain:
+            results.update(zip(uncertain, self._run_model([texts[i] for i in uncertain])))
+        return [results[i] for i in range(len(texts))]
+    
+    def _run_model(self, texts: List[str]) -> List[Dict]:
+        """Run the model over normalized texts in length-bucketed, token-budgeted batches"""
+        
+        encoded = self.tokenizer(texts, truncation=True, max_length=self.max_length)
+        sequences = encoded['input_ids']
+        lengths = [len(seq) for seq in sequences]
+        id2label = self.backend.id2label
+        
+        results = [None] * len(texts)
+        for batch in plan_batches(lengths, self.max_batch_tokens, self.batch_size):
+            input_ids, attention_mask = pad_batch([sequences[i] for i in batch], self.tokenizer.pad_token_id)
+            started = time.perf_counter()
+            with track('model_batch'):
+                probs = self.backend.forward(input_ids, attention_mask)
+            if self.tuner is not None:
+                self.tuner.observe(input_ids.size, time.perf_counter() - started)
+            MODEL_BATCH_TEXTS.observe(len(batch))
+            MODEL_BATCH_TOKENS.observe(input_ids.size)
+            
+            for i, score, label_id in zip(batch, probs.max(axis=-1).tolist(), probs.argmax(axis=-1).tolist()):
+                label = id2label[label_id]
+                results[i] = {
+                    'label': label,
+                    'score': score,
+                    'sentiment': score if label == 'POSITIVE' else -score,
+                    'stage': 'transformer'
+                }
+        
+        return results
+    
+    def analyze_dataframe(self, df: pd.DataFrame, text_column: str = 'text',
+                          analyze_fn: Optional[Callable[[List[str]], List[Dict]]] = None) -> pd.DataFrame:
+        """Analyze sentiment for DataFrame (analyze_fn defaults to analyze_batch)"""
         
         if df.empty or text_column not in df.columns:
             logger.warning(f"DataFrame is empty or '{text_column}' not found")
@@ -81,15 +369,11 @@ class SentimentAnalyzer:
         logger.info(f"Analyzing sentiment for {len(df)} items...")
         
         texts = df[text_column].fillna('').tolist()
-        results = self.analyze_batch(texts)
-        
-        df['sentiment_label'] = [r['label'] for r in results]
-        df['sentiment_score'] = [r['score'] for r in results]
-        df['sentiment'] = [r['sentiment'] for r in results]
-        
-        df['sentiment_category'] = df['sentiment'].apply(
-            lambda x: 'Positive' if x > 0.2 else ('Negative' if x < -0.2 else 'Neutral')
-        )
+        if analyze_fn is None:
+            analyze_fn = self.analyze_batch
+            if self.workers and len(texts) >= self.pool_min_rows:
+                analyze_fn = self._get_pool().analyze_batch
+        df = apply_results(df, analyze_fn(texts))
         
         logger.info("✅ Sentiment analysis complete")
         
@@ -98,21 +382,24 @@ class SentimentAnalyzer:
         
         return df
     
+    def _get_pool(self):
+        if self.pool is None:
+            from app.process_pool import ProcessPoolAnalyzer
+            self.pool = ProcessPoolAnalyzer(
+                self.workers,
+                threads_per_worker=int(os.getenv('POOL_THREADS_PER_WORKER', 1)),
+                chunk_size=int(os.getenv('POOL_CHUNK_SIZE', 256)),
+                backend=self.backend_name
+            )
+        return self.pool
+    
     def get_summary_statistics(self, df: pd.DataFrame) -> Dict:
         """Calculate summary stats"""
         
         if df.empty or 'sentiment' not in df.columns:
             return {}
         
-        return {
-            'total_items': len(df),
-            'positive_count': len(df[df['sentiment'] > 0.2]),
-            'negative_count': len(df[df['sentiment'] < -0.2]),
-            'neutral_count': len(df[df['sentiment'].between(-0.2, 0.2)]),
-            'avg_sentiment': df['sentiment'].mean(),
-            'positive_ratio': len(df[df['sentiment'] > 0.2]) / len(df) * 100,
-            'negative_ratio': len(df[df['sentiment'] < -0.2]) / len(df) * 100
-        }
+        return SentimentAggregate().update(df['sentiment'].to_numpy(dtype=np.float64)).to_dict()
 
 
 if __name__ == "__main__":
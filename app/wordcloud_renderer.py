@@ -0,0 +1,100 @@
+"""Word Cloud Rendering Module"""
+
+import base64
+import hashlib
+import json
+import re
+import threading
+from collections import Counter, OrderedDict
+from io import BytesIO
+from typing import Iterable, Optional
+from diskcache import Cache
+from wordcloud import WordCloud, STOPWORDS
+
+TOKEN_PATTERN = re.compile(r"\w[\w']*")  # Same tokenization as WordCloud.process_text
+STOPWORD_SET = {word.lower() for word in STOPWORDS}
+
+
+def count_tokens(text: str) -> Counter:
+    """Lower-cased word counts for one text, minus stopwords, numbers and possessive 's"""
+    counts = Counter()
+    for word in TOKEN_PATTERN.findall(text.lower()):
+        if word.endswith("'s"):
+            word = word[:-2]
+        if word and not word.isdigit() and word not in STOPWORD_SET:
+            counts[word] += 1
+    return counts
+
+
+def token_string(text: str) -> str:
+    """The words count_tokens counts, space-joined; count_tokens of the result gives the same counts"""
+    return ' '.join(count_tokens(text).elements())
+
+
+class WordCloudRenderer:
+    """Renders word clouds from merged per-article word counts, caching counts and encoded images"""
+    
+    def __init__(self, width: int = 1200, height: int = 600, image_format: str = 'PNG',
+                 quality: int = 80, max_words: int = 200, token_cache_size: int = 20000):
+        self.width = width
+        self.height = height
+        self.image_format = image_format.upper()
+        self.quality = quality
+        self.max_words = max_words
+        self.token_cache_size = token_cache_size
+        self.token_cache = OrderedDict()
+        self.image_cache = Cache('./data/cache/wordcloud', size_limit=64 * 1024 * 1024)
+        self.lock = threading.Lock()
+    
+    def article_counts(self, text: str) -> Counter:
+        """Token counts for one article, computed once per distinct text"""
+        
+        key = hashlib.sha1(text.encode('utf-8')).hexdigest()
+        with self.lock:
+            counts = self.token_cache.get(key)
+            if counts is not None:
+                self.token_cache.move_to_end(key)
+                return counts
+        
+        counts = count_tokens(text)
+        with self.lock:
+            self.token_cache[key] = counts
+            while len(self.token_cache) > self.token_cache_size:
+                self.token_cache.popitem(last=False)
+        return counts
+    
+    def frequencies(self, texts: Iterable[str]) -> Counter:
+        merged = Counter()
+        for text in texts:
+            merged.update(self.article_counts(text))
+        return merged
+    
+    def render(self, texts: Iterable[str]) -> Optional[str]:
+        """data: URI of the word cloud image, or None if there are no words"""
+        
+        top = self.frequencies(texts).most_common(self.max_words)
+        if not top:
+            return None
+        
+        # Identical word frequencies and output settings always produce the same image
+        fingerprint = hashlib.sha256(json.dumps(
+            [self.width, self.height, self.image_format, self.quality, top]
+        ).encode('utf-8')).hexdigest()
+        cached = self.image_cache.get(fingerprint)
+        if cached is not None:
+            return cached
+        
+        wordcloud = WordCloud(width=self.width, height=self.height, background_color='white',
+                              colormap='viridis', max_words=self.max_words, random_state=0)
+        image = wordcloud.generate_from_frequencies(dict(top)).to_image()
+        
+        buffer = BytesIO()
+        if self.image_format == 'PNG':
+            image.save(buffer, format='PNG', optimize=True)
+        else:
+            image.save(buffer, format=self.image_format, quality=self.quality)
+        
+        encoded = base64.b64encode(buffer.getvalue()).decode()
+        uri = f"data:image/{self.image_format.lower()};base64,{encoded}"
+        self.image_cache.set(fingerprint, uri)
+        return uri
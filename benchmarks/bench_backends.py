@@ -0,0 +1,63 @@
+"""Compare inference backends for label agreement, throughput and latency
+
+Usage: python -m benchmarks.bench_backends [--backends torch,torch-int8,onnx,onnx-int8]
+                                           [--texts 300] [--min-agreement 0.98]
+
+The fp32 'torch' backend is the reference. Exits non-zero if any backend's labels
+agree with it less often than --min-agreement.
+"""
+
+import argparse
+import sys
+import time
+
+import numpy as np
+
+from app.backends import BACKENDS
+from app.sentiment_analyzer import SentimentAnalyzer, normalize_text
+from benchmarks.corpus import synthetic_corpus
+
+
+def measure(analyzer, texts):
+    """Scores for texts plus batch throughput and single-text latencies"""
+    start = time.perf_counter()
+    results = analyzer._run_model(texts)
+    throughput = len(texts) / (time.perf_counter() - start)
+
+    latencies = []
+    for text in texts[:50]:
+        start = time.perf_counter()
+        analyzer._run_model([text])
+        latencies.append((time.perf_counter() - start) * 1000)
+
+    return results, throughput, np.percentile(latencies, [50, 95])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--backends', default=','.join(BACKENDS))
+    parser.add_argument('--texts', type=int, default=300)
+    parser.add_argument('--min-agreement', type=float, default=0.98)
+    args = parser.parse_args()
+
+    texts = [normalize_text(text) for text in synthetic_corpus(args.texts)]
+    reference = None
+    failed = False
+
+    print(f"{'backend':12s} {'agree':>7s} {'max|dscore|':>12s} {'texts/sec':>10s} {'p50 ms':>8s} {'p95 ms':>8s}")
+    for name in ['torch'] + [b for b in args.backends.split(',') if b != 'torch']:
+        results, throughput, (p50, p95) = measure(SentimentAnalyzer(backend=name), texts)
+        if reference is None:
+            reference = results
+
+        agreement = np.mean([r['label'] == ref['label'] for r, ref in zip(results, reference)])
+        max_diff = max(abs(r['sentiment'] - ref['sentiment']) for r, ref in zip(results, reference))
+        failed |= agreement < args.min_agreement
+
+        print(f"{name:12s} {agreement:7.1%} {max_diff:12.4f} {throughput:10.1f} {p50:8.2f} {p95:8.2f}")
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+"""Benchmark fixed-size vs length-bucketed, token-budgeted batching
+
+Usage: python -m benchmarks.bench_batching [--texts 500] [--batch-size 10] [--max-tokens 4096]
+"""
+
+import argparse
+import time
+
+from app.batching import plan_batches, padding_waste, pad_batch
+from app.sentiment_analyzer import SentimentAnalyzer, normalize_text
+from benchmarks.corpus import synthetic_corpus
+
+
+def fixed_batches(n, batch_size):
+    return [list(range(i, min(i + batch_size, n))) for i in range(0, n, batch_size)]
+
+
+def run(analyzer, sequences, batches):
+    start = time.perf_counter()
+    for batch in batches:
+        input_ids, attention_mask = pad_batch([sequences[i] for i in batch], analyzer.tokenizer.pad_token_id)
+        analyzer.backend.forward(input_ids, attention_mask)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--texts', type=int, default=500)
+    parser.add_argument('--batch-size', type=int, default=10)
+    parser.add_argument('--max-tokens', type=int, default=4096)
+    args = parser.parse_args()
+
+    analyzer = SentimentAnalyzer()
+    texts = [normalize_text(text) for text in synthetic_corpus(args.texts)]
+    sequences = analyzer.tokenizer(texts, truncation=True, max_length=analyzer.max_length)['input_ids']
+    lengths = [len(seq) for seq in sequences]
+
+    plans = {
+        f'fixed ({args.batch_size}/batch, arrival order)': fixed_batches(len(texts), args.batch_size),
+        f'planned ({args.max_tokens} tokens/batch)': plan_batches(lengths, args.max_tokens, analyzer.batch_size)
+    }
+
+    print(f"{len(texts)} texts, {sum(lengths)} real tokens")
+    for name, batches in plans.items():
+        elapsed = run(analyzer, sequences, batches)
+        print(f"{name:45s} batches={len(batches):4d} padding={padding_waste(lengths, batches):6.1%} "
+              f"texts/sec={len(texts) / elapsed:8.1f}")
+
+
+if __name__ == "__main__":
+    main()
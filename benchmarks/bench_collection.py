@@ -0,0 +1,39 @@
+"""Benchmark sequential vs concurrent paginated NewsAPI collection against the local stub
+
+Usage: python -m benchmarks.bench_collection [--latency-ms 200] [--max-results 100,500,1000]
+"""
+
+import argparse
+import os
+import time
+
+from benchmarks.stub_newsapi import StubNewsAPI
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--latency-ms', type=float, default=200)
+    parser.add_argument('--max-results', default='100,500,1000')
+    parser.add_argument('--concurrency', type=int, default=10)
+    args = parser.parse_args()
+
+    with StubNewsAPI(latency_ms=args.latency_ms, total=2000) as stub:
+        os.environ.update(NEWS_API_URL=stub.url, NEWS_API_KEY='stub')
+        from app.data_collector import NewsCollector, cache
+
+        print(f"round trip ~{args.latency_ms:.0f} ms")
+        for max_results in [int(n) for n in args.max_results.split(',')]:
+            for concurrency in (1, args.concurrency):
+                os.environ['NEWS_API_CONCURRENCY'] = str(concurrency)
+                collector = NewsCollector()
+                cache.clear()
+
+                start = time.perf_counter()
+                articles = collector.search_news('benchmark', max_results)
+                elapsed = time.perf_counter() - start
+                print(f"max_results={max_results:5d} concurrency={concurrency:3d} "
+                      f"articles={len(articles):5d} elapsed={elapsed * 1000:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
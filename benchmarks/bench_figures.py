@@ -0,0 +1,64 @@
+"""Benchmark figure payload size and build time as article count grows
+
+Usage: python -m benchmarks.bench_figures [--rows 100,1000,10000,100000]
+"""
+
+import argparse
+import os
+import time
+
+import numpy as np
+import pandas as pd
+import plotly.express as px
+
+os.environ.setdefault('NEWS_API_KEY', '')
+from app.dashboard import create_histogram, create_timeline  # noqa: E402
+from app.sentiment_analyzer import categorize  # noqa: E402
+
+
+def legacy_timeline(df):
+    colors = {'Positive': '#27ae60', 'Neutral': '#f39c12', 'Negative': '#e74c3c'}
+    fig = px.scatter(df.sort_values('created_at'), x='created_at', y='sentiment', color='sentiment_category',
+                     color_discrete_map=colors, title="<b>Sentiment Timeline</b>")
+    fig.update_traces(marker=dict(size=10))
+    return fig
+
+
+def legacy_histogram(df):
+    return px.histogram(df, x='sentiment', nbins=25, color_discrete_sequence=['#3498db'],
+                        title="<b>Sentiment Score Distribution</b>")
+
+
+def analyzed_frame(rows, days=7, seed=0):
+    rng = np.random.default_rng(seed)
+    sentiment = rng.uniform(-1, 1, rows)
+    return pd.DataFrame({
+        'created_at': pd.Timestamp('2026-01-31') - pd.to_timedelta(rng.uniform(0, days * 86400, rows), unit='s'),
+        'sentiment': sentiment,
+        'sentiment_category': categorize(sentiment)
+    })
+
+
+def measure(builder, df):
+    start = time.perf_counter()
+    payload = builder(df).to_json()
+    return len(payload), time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', default='100,1000,10000,100000')
+    args = parser.parse_args()
+
+    builders = [('timeline', legacy_timeline, create_timeline), ('histogram', legacy_histogram, create_histogram)]
+    for rows in [int(r) for r in args.rows.split(',')]:
+        df = analyzed_frame(rows)
+        for name, legacy, current in builders:
+            legacy_size, legacy_time = measure(legacy, df)
+            size, elapsed = measure(current, df)
+            print(f"rows={rows:7d} {name:9s} legacy {legacy_size / 1024:9.1f} KiB {legacy_time * 1000:8.1f} ms | "
+                  f"current {size / 1024:7.1f} KiB {elapsed * 1000:7.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
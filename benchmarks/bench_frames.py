@@ -0,0 +1,66 @@
+"""Benchmark memory per row of scored article frames, before and after compaction
+
+Usage: python -m benchmarks.bench_frames [--rows 10000,100000]
+
+"before" is the pipeline's original representation: object strings, float64 scores, string
+labels and the query and collection time repeated on every row. "compact" is compact_frame
+(categoricals, float32, Arrow strings, per-frame metadata); "compact, no text" also replaces the
+description with the word cloud's tokens, as the dashboard does once articles are scored.
+"""
+
+import argparse
+import time
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from app.autotune import sample_texts
+from app.frames import bytes_per_row, compact_frame
+from benchmarks.corpus import synthetic_corpus
+
+SOURCES = ['news_Reuters', 'news_Associated Press', 'news_BBC News', 'news_Wired', 'news_The Verge',
+           'news_Bloomberg', 'news_Financial Times', 'news_TechCrunch']
+
+
+def legacy_frame(rows, query='artificial intelligence', seed=0):
+    rng = np.random.default_rng(seed)
+    sentiment = rng.uniform(-1, 1, rows)
+    return pd.DataFrame({
+        'title': synthetic_corpus(rows, short_words=(6, 14), long_fraction=0, seed=seed),
+        'text': sample_texts(rows, seed=seed),
+        'created_at': datetime(2026, 1, 31) - pd.to_timedelta(rng.uniform(0, 30 * 86400, rows), unit='s'),
+        'source': rng.choice(SOURCES, rows).astype(object),
+        'url': [f"https://news.example.com/{seed}/{i}" for i in range(rows)],
+        'query': query,
+        'collected_at': datetime(2026, 1, 31, 12),
+        'sentiment_label': np.where(sentiment > 0, 'POSITIVE', 'NEGATIVE').astype(object),
+        'sentiment_score': np.abs(sentiment),
+        'sentiment': sentiment,
+        'sentiment_category': np.where(sentiment > 0.2, 'Positive',
+                                       np.where(sentiment < -0.2, 'Negative', 'Neutral')).astype(object),
+        'sentiment_stage': 'transformer'
+    })
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', default='10000,100000')
+    args = parser.parse_args()
+
+    print(f"{'rows':>8s} {'representation':18s} {'bytes/row':>10s} {'vs before':>10s} {'convert':>9s}")
+    for rows in (int(r) for r in args.rows.split(',')):
+        before = legacy_frame(rows)
+        baseline = bytes_per_row(before)
+        print(f"{rows:8d} {'before':18s} {baseline:10,.0f} {'':>10s} {'':>9s}")
+
+        for label, drop_text in (('compact', False), ('compact, no text', True)):
+            start = time.perf_counter()
+            compact = compact_frame(before, drop_text=drop_text)
+            elapsed = time.perf_counter() - start
+            size = bytes_per_row(compact)
+            print(f"{rows:8d} {label:18s} {size:10,.0f} {size / baseline:9.0%} {elapsed:8.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""Benchmark HistoryStore write/read throughput
+
+Usage: python -m benchmarks.bench_history_store [--rows 1000000] [--root /tmp/history-bench]
+"""
+
+import argparse
+import shutil
+import time
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+import pyarrow.dataset as ds
+
+from app.history_store import HistoryStore
+
+QUERIES = ['artificial intelligence', 'climate change', 'cryptocurrency', 'remote work', 'electric vehicles']
+
+
+def synthetic_frame(rows, query, seed, days=30):
+    rng = np.random.default_rng(seed)
+    now = datetime(2026, 1, 31)
+    sentiment = rng.uniform(-1, 1, rows)
+    return pd.DataFrame({
+        'title': [f"{query} headline {i}" for i in range(rows)],
+        'text': [f"Story {i} about {query} and what it means for markets." for i in range(rows)],
+        'created_at': now - pd.to_timedelta(rng.uniform(0, days * 86400, rows), unit='s'),
+        'source': rng.choice(['news_Reuters', 'news_AP', 'news_BBC', 'news_Wired'], rows),
+        'url': [f"https://example.com/{seed}/{i}" for i in range(rows)],
+        'query': query,
+        'collected_at': now,
+        'sentiment_label': np.where(sentiment > 0, 'POSITIVE', 'NEGATIVE'),
+        'sentiment_score': np.abs(sentiment),
+        'sentiment': sentiment,
+        'sentiment_category': np.where(sentiment > 0.2, 'Positive', np.where(sentiment < -0.2, 'Negative', 'Neutral'))
+    })
+
+
+def timed(label, rows, fn):
+    start = time.perf_counter()
+    result = fn()
+    elapsed = time.perf_counter() - start
+    count = rows if rows is not None else len(result)
+    print(f"{label:45s} rows={count:9d} {elapsed:7.2f}s {count / elapsed:12,.0f} rows/sec")
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=1_000_000)
+    parser.add_argument('--root', default='/tmp/history-bench')
+    args = parser.parse_args()
+
+    shutil.rmtree(args.root, ignore_errors=True)
+    store = HistoryStore(args.root)
+
+    per_query = args.rows // len(QUERIES)
+    frames = [(query, synthetic_frame(per_query, query, seed)) for seed, query in enumerate(QUERIES)]
+    timed("write (one append per query)", per_query * len(QUERIES),
+          lambda: [store.write(df, query) for query, df in frames])
+
+    end = datetime(2026, 1, 31)
+    timed("read all columns", None, lambda: store.read())
+    timed("read projection [created_at, sentiment]", None, lambda: store.read(columns=['created_at', 'sentiment']))
+    timed("read one query, last 7 days, projected", None,
+          lambda: store.read(QUERIES[0], end - timedelta(days=7), end, columns=['created_at', 'sentiment']))
+    timed("read one query, one day, Positive only", None,
+          lambda: store.read(QUERIES[0], end - timedelta(days=1), end, columns=['created_at', 'sentiment'],
+                             filter=ds.field('sentiment_category') == 'Positive'))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+"""Benchmark process-pool inference scaling against the single-process path
+
+Usage: python -m benchmarks.bench_process_pool [--texts 2000] [--max-workers 4] [--threads-per-worker 1]
+
+Sentiment results are cached in a scratch directory (shared with the workers), so repeated runs start cold too.
+"""
+
+import argparse
+import os
+import tempfile
+import time
+
+from app.process_pool import ProcessPoolAnalyzer
+from app.sentiment_analyzer import SentimentAnalyzer
+from benchmarks.corpus import unique_corpus
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--texts', type=int, default=2000)
+    parser.add_argument('--max-workers', type=int, default=os.cpu_count())
+    parser.add_argument('--threads-per-worker', type=int, default=1)
+    parser.add_argument('--chunk-size', type=int, default=256)
+    args = parser.parse_args()
+
+    scratch = tempfile.TemporaryDirectory(prefix='sentiment-bench-')
+    os.environ['RESULT_CACHE_DIR'] = scratch.name
+    analyzer = SentimentAnalyzer()
+    start = time.perf_counter()
+    analyzer._run_model(unique_corpus(args.texts, seed=0))
+    baseline = args.texts / (time.perf_counter() - start)
+    print(f"{'single process':16s} texts/sec={baseline:8.1f}")
+
+    for workers in range(1, args.max_workers + 1):
+        pool = ProcessPoolAnalyzer(workers, args.threads_per_worker, args.chunk_size)
+        # Warm the pool so model loading is not counted
+        pool.analyze_batch(unique_corpus(workers * args.chunk_size, seed=2 * workers))
+
+        start = time.perf_counter()
+        pool.analyze_batch(unique_corpus(args.texts, seed=2 * workers + 1))
+        throughput = args.texts / (time.perf_counter() - start)
+        pool.shutdown()
+
+        print(f"{workers:2d} workers       texts/sec={throughput:8.1f} speedup={throughput / baseline:5.2f}x")
+    scratch.cleanup()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""Compare direct per-callback inference with the shared micro-batching scheduler
+
+Usage: python -m benchmarks.bench_scheduler [--users 10,20,50] [--texts-per-request 20]
+
+Every simulated user sends one request of unseen texts at the same moment, as when
+many people click "Analyze" together. Reports p50/p95 request latency and throughput.
+Sentiment results are cached in a scratch directory, so repeated runs start cold too.
+"""
+
+import argparse
+import os
+import tempfile
+import threading
+import time
+
+import numpy as np
+
+from app.inference_scheduler import InferenceScheduler
+from app.sentiment_analyzer import SentimentAnalyzer
+from benchmarks.corpus import unique_corpus
+
+
+def run(analyze_fn, users, texts_per_request, first_seed=0):
+    requests = [unique_corpus(texts_per_request, seed) for seed in range(first_seed, first_seed + users)]
+    latencies = [0.0] * users
+    barrier = threading.Barrier(users + 1)
+
+    def user(i):
+        barrier.wait()
+        start = time.perf_counter()
+        analyze_fn(requests[i])
+        latencies[i] = time.perf_counter() - start
+
+    threads = [threading.Thread(target=user, args=(i,)) for i in range(users)]
+    for thread in threads:
+        thread.start()
+    barrier.wait()
+    start = time.perf_counter()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    p50, p95 = np.percentile(latencies, [50, 95])
+    return p50 * 1000, p95 * 1000, users * texts_per_request / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--users', default='10,20,50')
+    parser.add_argument('--texts-per-request', type=int, default=20)
+    parser.add_argument('--max-batch-size', type=int, default=128)
+    parser.add_argument('--max-wait-ms', type=float, default=10)
+    args = parser.parse_args()
+
+    scratch = tempfile.TemporaryDirectory(prefix='sentiment-bench-')
+    os.environ['RESULT_CACHE_DIR'] = scratch.name
+    analyzer = SentimentAnalyzer()
+    scheduler = InferenceScheduler(analyzer.analyze_batch, args.max_batch_size, args.max_wait_ms)
+
+    print(f"{'users':>5s} {'mode':10s} {'p50 ms':>9s} {'p95 ms':>9s} {'texts/sec':>10s}")
+    seed = 0
+    for users in [int(u) for u in args.users.split(',')]:
+        for mode, analyze_fn in (('direct', analyzer.analyze_batch), ('scheduled', scheduler.analyze_batch)):
+            # Every run gets texts of its own, so neither mode answers from the other's cached results
+            p50, p95, throughput = run(analyze_fn, users, args.texts_per_request, seed)
+            seed += users
+            print(f"{users:5d} {mode:10s} {p50:9.1f} {p95:9.1f} {throughput:10.1f}")
+
+    print(f"scheduler: {scheduler.stats()}")
+    scratch.cleanup()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+"""Measure dashboard startup: process start -> login page served -> model ready
+
+Usage: python -m benchmarks.bench_startup [--port 8765] [--timeout 300]
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+
+
+def wait_for(url, deadline):
+    """Poll url until it answers 200, False if the deadline passes first"""
+    while time.perf_counter() < deadline:
+        try:
+            with urllib.request.urlopen(url, timeout=1) as response:
+                if response.status == 200:
+                    return True
+        except (urllib.error.URLError, ConnectionError, TimeoutError):
+            pass
+        time.sleep(0.05)
+    return False
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--timeout', type=float, default=300)
+    args = parser.parse_args()
+
+    base = f"http://127.0.0.1:{args.port}"
+    env = dict(os.environ, PORT=str(args.port), HOST='127.0.0.1', DEBUG_MODE='false')
+
+    start = time.perf_counter()
+    deadline = start + args.timeout
+    process = subprocess.Popen([sys.executable, '-m', 'app.dashboard'], env=env,
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        if wait_for(f"{base}/", deadline) and wait_for(f"{base}/_dash-layout", deadline):
+            print(f"login page served: {time.perf_counter() - start:6.2f}s after process start")
+        else:
+            print("login page not served before timeout")
+            return
+
+        if wait_for(f"{base}/ready", deadline):
+            print(f"model ready:       {time.perf_counter() - start:6.2f}s after process start")
+        else:
+            print("model not ready before timeout")
+    finally:
+        process.terminate()
+        process.wait()
+
+
+if __name__ == "__main__":
+    main()
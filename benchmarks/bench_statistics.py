@@ -0,0 +1,84 @@
+"""Benchmark sentiment column building and summary statistics on large frames
+
+Usage: python -m benchmarks.bench_statistics [--rows 100000,1000000]
+
+Compares the original per-row implementation with the vectorized one and checks
+that both produce the same statistics.
+"""
+
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from app.sentiment_analyzer import SentimentAggregate, apply_results
+
+
+def legacy_apply(df, results):
+    df['sentiment_label'] = [r['label'] for r in results]
+    df['sentiment_score'] = [r['score'] for r in results]
+    df['sentiment'] = [r['sentiment'] for r in results]
+    df['sentiment_category'] = df['sentiment'].apply(
+        lambda x: 'Positive' if x > 0.2 else ('Negative' if x < -0.2 else 'Neutral')
+    )
+    return df
+
+
+def legacy_statistics(df):
+    return {
+        'total_items': len(df),
+        'positive_count': len(df[df['sentiment'] > 0.2]),
+        'negative_count': len(df[df['sentiment'] < -0.2]),
+        'neutral_count': len(df[df['sentiment'].between(-0.2, 0.2)]),
+        'avg_sentiment': df['sentiment'].mean(),
+        'positive_ratio': len(df[df['sentiment'] > 0.2]) / len(df) * 100,
+        'negative_ratio': len(df[df['sentiment'] < -0.2]) / len(df) * 100
+    }
+
+
+def synthetic_results(rows, seed=0):
+    rng = np.random.default_rng(seed)
+    scores = rng.uniform(0.5, 1.0, rows)
+    positive = rng.random(rows) < 0.5
+    return [{'label': 'POSITIVE' if p else 'NEGATIVE', 'score': s, 'sentiment': s if p else -s}
+            for p, s in zip(positive.tolist(), scores.tolist())]
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', default='100000,1000000')
+    args = parser.parse_args()
+
+    for rows in [int(r) for r in args.rows.split(',')]:
+        results = synthetic_results(rows)
+        base = pd.DataFrame({'text': [''] * rows})
+
+        legacy_df, legacy_columns = timed(lambda: legacy_apply(base.copy(), results))
+        legacy_stats, legacy_summary = timed(lambda: legacy_statistics(legacy_df))
+        new_df, new_columns = timed(lambda: apply_results(base.copy(), results))
+        new_stats, new_summary = timed(lambda: SentimentAggregate().update(new_df['sentiment'].to_numpy()).to_dict())
+
+        # Streaming: the same statistics from ten merged partial aggregates
+        chunks = np.array_split(new_df['sentiment'].to_numpy(), 10)
+        merged = SentimentAggregate()
+        for chunk in chunks:
+            merged = merged.merge(SentimentAggregate().update(chunk))
+
+        same = all(np.isclose(legacy_stats[k], new_stats[k]) and np.isclose(new_stats[k], merged.to_dict()[k])
+                   for k in legacy_stats)
+        print(f"rows={rows:8d} columns: legacy {legacy_columns:6.3f}s new {new_columns:6.3f}s "
+              f"({legacy_columns / new_columns:4.1f}x) | statistics: legacy {legacy_summary * 1000:8.2f} ms "
+              f"new {new_summary * 1000:6.2f} ms ({legacy_summary / new_summary:5.1f}x) | "
+              f"memory: legacy {legacy_df.memory_usage(deep=True).sum() / rows:5.1f} B/row "
+              f"new {new_df.memory_usage(deep=True).sum() / rows:5.1f} B/row | match={same}")
+
+
+if __name__ == "__main__":
+    main()
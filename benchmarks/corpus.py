@@ -0,0 +1,22 @@
+"""Synthetic corpora for benchmarks"""
+
+import random
+
+WORDS = ("market stock shares rally slump growth record profit loss company report "
+         "analysts expect strong weak quarter outlook investors ai climate policy").split()
+
+
+def synthetic_corpus(n, short_words=(8, 30), long_words=(150, 400), long_fraction=0.1, seed=0):
+    """Mostly headline-sized texts with a tail (long_fraction) of long article bodies"""
+    rng = random.Random(seed)
+    texts = []
+    for _ in range(n):
+        low, high = long_words if rng.random() < long_fraction else short_words
+        texts.append(' '.join(rng.choice(WORDS) for _ in range(rng.randint(low, high))))
+    return texts
+
+
+def unique_corpus(n, seed=0, **kwargs):
+    """synthetic_corpus with a distinct prefix per text (from the seed), so result caches never answer within a run"""
+    rng = random.Random(f"prefix-{seed}")
+    return [f"{rng.getrandbits(128):032x} {text}" for text in synthetic_corpus(n, seed=seed, **kwargs)]
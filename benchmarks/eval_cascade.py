@@ -0,0 +1,96 @@
+"""Evaluate the lexical cascade against transformer-only scoring at several thresholds
+
+Usage: python -m benchmarks.eval_cascade [--input headlines.csv] [--text-column text] [--texts 2000]
+                                         [--thresholds 0.6,0.7,0.8,0.9,0.95,0.99] [--fit-fraction 0.5]
+
+Without --input, synthetic headlines are used. With --fit-fraction, the lexical scorer is first
+distilled from the transformer's labels on that share of the texts and evaluated on the rest;
+otherwise the analyzer's configured scorer (distilled weights if present, else the seed lexicon)
+is evaluated. For each threshold it reports the share of texts the lexical stage answers, label
+agreement with transformer-only results (overall and on the lexical share), the mean absolute
+sentiment difference, and the speedup over running every text through the model.
+"""
+
+import argparse
+import random
+import time
+
+import numpy as np
+
+from app.batch_score import detect_format, read_chunks
+from app.cascade import LEXICON, LexicalScorer
+from app.sentiment_analyzer import SentimentAnalyzer, normalize_text
+from benchmarks.corpus import WORDS
+
+
+def synthetic_headlines(n, seed=0):
+    """Headline-sized texts, most carrying one or two polar words"""
+    rng = random.Random(seed)
+    polar = sorted(LEXICON)
+    texts = []
+    for _ in range(n):
+        words = [rng.choice(WORDS) for _ in range(rng.randint(6, 14))]
+        for _ in range(rng.choice([0, 1, 1, 2])):
+            words.insert(rng.randrange(len(words)), rng.choice(polar))
+        texts.append(' '.join(words).capitalize())
+    return texts
+
+
+def load_texts(args):
+    if not args.input:
+        return synthetic_headlines(args.texts)
+    texts = []
+    for chunk in read_chunks(args.input, detect_format(args.input), 10000):
+        texts.extend(chunk[args.text_column].fillna('').astype(str))
+        if len(texts) >= args.texts:
+            break
+    return texts[:args.texts]
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--input', help="corpus file (.csv, .jsonl/.ndjson or .parquet); synthetic if omitted")
+    parser.add_argument('--text-column', default='text')
+    parser.add_argument('--texts', type=int, default=2000)
+    parser.add_argument('--thresholds', default='0.6,0.7,0.8,0.9,0.95,0.99')
+    parser.add_argument('--fit-fraction', type=float, default=0.0)
+    args = parser.parse_args()
+
+    texts = [normalize_text(text) for text in load_texts(args)]
+    analyzer = SentimentAnalyzer()
+    analyzer._run_model(texts[:32])  # Warm up before timing
+
+    scorer = analyzer.cascade or analyzer._load_cascade()
+    if args.fit_fraction:
+        split = int(len(texts) * args.fit_fraction)
+        fit_texts, texts = texts[:split], texts[split:]
+        labels = np.array([r['label'] == 'POSITIVE' for r in analyzer._run_model(fit_texts)])
+        scorer = LexicalScorer().fit(fit_texts, labels)
+        print(f"Distilled lexical scorer on {len(fit_texts)} texts, evaluating on {len(texts)}")
+    analyzer.cascade = scorer
+
+    reference, model_seconds = timed(lambda: analyzer._run_model(texts))
+    print(f"Transformer only: {len(texts)} texts in {model_seconds:.2f}s ({len(texts) / model_seconds:.0f} texts/sec)\n")
+
+    print(f"{'threshold':>9s} {'lexical':>8s} {'agree':>7s} {'agree(lex)':>10s} {'mean|ds|':>9s} "
+          f"{'seconds':>8s} {'speedup':>8s}")
+    for threshold in (float(t) for t in args.thresholds.split(',')):
+        results, seconds = timed(lambda: analyzer._score_uncached(texts, threshold))
+        lexical = [r['stage'] == 'lexical' for r in results]
+        agree = [r['label'] == ref['label'] for r, ref in zip(results, reference)]
+        lexical_agree = [a for a, lex in zip(agree, lexical) if lex]
+        diff = np.mean([abs(r['sentiment'] - ref['sentiment']) for r, ref in zip(results, reference)])
+
+        print(f"{threshold:9.2f} {np.mean(lexical):8.1%} {np.mean(agree):7.1%} "
+              f"{np.mean(lexical_agree) if lexical_agree else float('nan'):10.1%} {diff:9.3f} "
+              f"{seconds:8.2f} {model_seconds / seconds:7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,246 @@
+"""Reproducible offline benchmark suite for the collect -> analyze -> render pipeline
+
+Usage (from the repository root):
+
+    python -m benchmarks.run_suite [--sizes 100,1000,5000] [--output bench-results.json]
+                                   [--baseline previous.json]
+
+Everything runs offline in a scratch directory: NewsAPI is replaced by the local stub
+server (benchmarks/stub_newsapi.py), the model by a tiny locally built DistilBERT
+(benchmarks/tiny_model.py) unless --model is given, and texts by synthetic corpora
+(benchmarks/corpus.py). Results are written as JSON; --baseline prints the relative
+change of every metric against an earlier results file.
+"""
+
+import argparse
+import json
+import os
+import platform
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+from plotly.utils import PlotlyJSONEncoder
+
+REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO)
+
+from benchmarks.corpus import unique_corpus  # noqa: E402
+from benchmarks.stub_newsapi import StubNewsAPI  # noqa: E402
+from benchmarks.tiny_model import build_tiny_model  # noqa: E402
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - start
+
+
+def bench_analyze_batch(analyzer, sizes, corpus_args):
+    results = {}
+    for size in sizes:
+        texts = unique_corpus(size, seed=size, **corpus_args)
+        _, cold = timed(lambda: analyzer.analyze_batch(texts))
+        _, warm = timed(lambda: analyzer.analyze_batch(texts))
+        results[str(size)] = {
+            'cold_texts_per_sec': size / cold,
+            'warm_texts_per_sec': size / warm,
+            'cold_seconds': cold
+        }
+    return results
+
+
+def bench_analyze_dataframe(analyzer, sizes, corpus_args):
+    results = {}
+    for size in sizes:
+        df = pd.DataFrame({'text': unique_corpus(size, seed=size + 1, **corpus_args)})
+        tracemalloc.start()
+        df, elapsed = timed(lambda: analyzer.analyze_dataframe(df))
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        results[str(size)] = {
+            'seconds': elapsed,
+            'python_peak_bytes': peak,
+            'frame_bytes_per_row': int(df.memory_usage(deep=True).sum()) / size
+        }
+    return results
+
+
+def analyzed_frame(analyzer, size, corpus_args):
+    rng = np.random.default_rng(size)
+    df = pd.DataFrame({
+        'text': unique_corpus(size, seed=size + 2, **corpus_args),
+        'created_at': pd.Timestamp('2026-01-31') - pd.to_timedelta(rng.uniform(0, 7 * 86400, size), unit='s')
+    })
+    return analyzer.analyze_dataframe(df)
+
+
+def payload_bytes(component):
+    """Size of what Dash sends to the browser for a figure or component"""
+    if hasattr(component, 'to_json'):
+        return len(component.to_json())
+    return len(json.dumps(component.to_plotly_json(), cls=PlotlyJSONEncoder))
+
+
+def bench_figures(dashboard, analyzer, sizes, corpus_args):
+    builders = {
+        'pie_chart': dashboard.create_pie_chart,
+        'timeline': dashboard.create_timeline,
+        'histogram': dashboard.create_histogram,
+        'wordcloud': dashboard.create_wordcloud
+    }
+    results = {}
+    for size in sizes:
+        df = analyzed_frame(analyzer, size, corpus_args)
+        results[str(size)] = {}
+        for name, builder in builders.items():
+            figure, cold = timed(lambda: builder(df))
+            _, warm = timed(lambda: builder(df))
+            results[str(size)][name] = {'cold_ms': cold * 1000, 'warm_ms': warm * 1000,
+                                        'payload_bytes': payload_bytes(figure)}
+    return results
+
+
+def bench_end_to_end(dashboard, max_results):
+    """run_analysis latency per stage for a cold query and the same query again, then each tab's first render"""
+
+    from app.jobs import Job
+
+    class TimedJob(Job):
+        def __init__(self, key):
+            super().__init__(key)
+            self.started = time.perf_counter()
+            self.stage_ms = {}
+
+        def publish(self, stage, value):
+            super().publish(stage, value)
+            self.stage_ms[stage] = (time.perf_counter() - self.started) * 1000
+
+    results = {}
+    for run in ('cold', 'warm'):
+        job = TimedJob(('benchmark', max_results))
+        dashboard.run_analysis(job, 'benchmark query', max_results)
+        results[run] = {'total_ms': (time.perf_counter() - job.started) * 1000, 'stage_ms': job.stage_ms,
+                        'tab_ms': {}}
+        for tab in dashboard.TAB_OUTPUTS:
+            start = time.perf_counter()
+            dashboard.tab_content(job.stages['result'], tab)
+            results[run]['tab_ms'][tab] = (time.perf_counter() - start) * 1000
+    return results
+
+
+def flatten(tree, prefix=''):
+    for key, value in tree.items():
+        path = f"{prefix}.{key}" if prefix else key
+        if isinstance(value, dict):
+            yield from flatten(value, path)
+        elif isinstance(value, (int, float)):
+            yield path, value
+
+
+def compare(results, baseline_path):
+    with open(baseline_path) as f:
+        baseline = dict(flatten(json.load(f)['results']))
+    print(f"\nChange vs {baseline_path}:")
+    for path, value in flatten(results):
+        old = baseline.get(path)
+        if old:
+            print(f"  {path:60s} {old:14.2f} -> {value:14.2f} ({(value - old) / old:+7.1%})")
+
+
+def git_revision():
+    try:
+        return subprocess.check_output(['git', 'rev-parse', 'HEAD'], cwd=REPO, text=True).strip()
+    except Exception:
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', default='100,1000,5000', help="corpus sizes (texts)")
+    parser.add_argument('--short-words', default='8,30', help="word count range of short texts")
+    parser.add_argument('--long-words', default='150,400', help="word count range of long texts")
+    parser.add_argument('--long-fraction', type=float, default=0.1)
+    parser.add_argument('--max-results', type=int, default=300, help="articles per end-to-end query")
+    parser.add_argument('--stub-latency-ms', type=float, default=50)
+    parser.add_argument('--model', help="model name/path to use instead of the tiny local model")
+    parser.add_argument('--output', default='bench-results.json')
+    parser.add_argument('--baseline', help="earlier results JSON to compare against")
+    args = parser.parse_args()
+
+    sizes = [int(s) for s in args.sizes.split(',')]
+    corpus_args = {
+        'short_words': tuple(int(n) for n in args.short_words.split(',')),
+        'long_words': tuple(int(n) for n in args.long_words.split(',')),
+        'long_fraction': args.long_fraction
+    }
+    output = os.path.abspath(args.output)
+
+    # A scratch working directory keeps caches cold and the repository clean
+    cwd = os.getcwd()
+    workdir = tempfile.mkdtemp(prefix='sentiment-bench-')
+    try:
+        os.symlink(os.path.join(REPO, 'config'), os.path.join(workdir, 'config'))
+        model = args.model or build_tiny_model(os.path.join(workdir, 'tiny-model'))
+
+        stub = StubNewsAPI(latency_ms=args.stub_latency_ms, total=max(args.max_results, 100)).start()
+        os.environ.update(MODEL_NAME=model, NEWS_API_URL=stub.url, NEWS_API_KEY='stub')
+        os.chdir(workdir)
+
+        from loguru import logger
+        logger.remove()
+        logger.add(sys.stderr, level='WARNING')
+
+        from app import dashboard
+        analyzer = dashboard.model_loader.wait()
+        if analyzer is None:
+            sys.exit(f"Model failed to load: {dashboard.model_loader.status()}")
+
+        try:
+            results = {
+                'startup': {'model_load_seconds': dashboard.model_loader.status()['load_seconds']},
+                'analyze_batch': bench_analyze_batch(analyzer, sizes, corpus_args),
+                'analyze_dataframe': bench_analyze_dataframe(analyzer, sizes, corpus_args),
+                'figures': bench_figures(dashboard, analyzer, sizes, corpus_args),
+                'end_to_end': bench_end_to_end(dashboard, args.max_results),
+                'process': {'max_rss_bytes': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024}
+            }
+        finally:
+            stub.stop()
+    finally:
+        os.chdir(cwd)
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    report = {
+        'meta': {
+            'timestamp': datetime.now().isoformat(timespec='seconds'),
+            'git_revision': git_revision(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count(),
+            'model': args.model or 'tiny-local',
+            'backend': analyzer.backend_name,
+            'args': vars(args)
+        },
+        'results': results
+    }
+    with open(output, 'w') as f:
+        json.dump(report, f, indent=2)
+
+    for path, value in flatten(results):
+        print(f"{path:60s} {value:14.2f}")
+    print(f"\nWrote {output}")
+
+    if args.baseline:
+        compare(results, args.baseline)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+"""Local stand-in for the NewsAPI /v2/everything endpoint
+
+Serves deterministic canned pages with configurable latency so collection can be
+benchmarked and exercised offline. Point NEWS_API_URL at it:
+
+    python -m benchmarks.stub_newsapi --port 8901 --latency-ms 200 --total 1000
+    NEWS_API_URL=http://127.0.0.1:8901/v2 NEWS_API_KEY=stub python -m app.data_collector
+"""
+
+import argparse
+import json
+import threading
+import time
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+HEADLINES = [
+    "Shares rally as {q} outlook improves",
+    "Regulators warn of risks around {q}",
+    "Investors cautious ahead of {q} report",
+    "Record growth reported for {q} sector",
+    "Analysts cut forecasts after weak {q} quarter",
+    "Startups race to build on {q}",
+]
+
+
+def make_article(query, index, now):
+    """Deterministic article; every 20th repeats an earlier URL to exercise de-duplication"""
+    url_index = index - 1 if index % 20 == 19 else index
+    headline = HEADLINES[index % len(HEADLINES)].format(q=query)
+    return {
+        'source': {'id': None, 'name': f"Stub Wire {index % 7}"},
+        'title': headline,
+        'description': f"{headline}. Story {index} covers the latest developments in {query}.",
+        'content': None,
+        'url': f"https://news.example.com/{query.replace(' ', '-')}/{url_index}",
+        'publishedAt': (now - timedelta(minutes=7 * index)).strftime('%Y-%m-%dT%H:%M:%SZ')
+    }
+
+
+class StubNewsAPI:
+    """Threaded HTTP server returning canned NewsAPI pages"""
+
+    def __init__(self, port=0, latency_ms=0.0, total=1000, rate_limit_every=0):
+        self.latency = latency_ms / 1000
+        self.total = total
+        self.rate_limit_every = rate_limit_every
+        self.requests = 0
+        self.lock = threading.Lock()
+        self.now = datetime.utcnow().replace(microsecond=0)
+        self.server = ThreadingHTTPServer(('127.0.0.1', port), self._handler())
+        self.server.daemon_threads = True
+        self.thread = None
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.server.server_address[1]}/v2"
+
+    def _handler(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                parsed = urlparse(self.path)
+                params = {k: v[0] for k, v in parse_qs(parsed.query).items()}
+                with stub.lock:
+                    stub.requests += 1
+                    throttled = stub.rate_limit_every and stub.requests % stub.rate_limit_every == 0
+                time.sleep(stub.latency)
+
+                if parsed.path != '/v2/everything':
+                    return self._send(404, {'status': 'error', 'code': 'notFound'})
+                if throttled:
+                    return self._send(429, {'status': 'error', 'code': 'rateLimited'}, {'Retry-After': '0'})
+
+                self._send(200, stub.page(params))
+
+            def _send(self, status, body, headers=None):
+                payload = json.dumps(body).encode()
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(payload)))
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+    def page(self, params):
+        query = params.get('q', '')
+        page = int(params.get('page', 1))
+        page_size = int(params.get('pageSize', 100))
+        start = (page - 1) * page_size
+        articles = [make_article(query, i, self.now) for i in range(start, min(start + page_size, self.total))]
+
+        since = params.get('from')
+        if since and 'T' in since:
+            articles = [a for a in articles if a['publishedAt'] >= since[:19] + 'Z']
+
+        return {'status': 'ok', 'totalResults': self.total, 'articles': articles}
+
+    def start(self):
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--port', type=int, default=8901)
+    parser.add_argument('--latency-ms', type=float, default=100)
+    parser.add_argument('--total', type=int, default=1000)
+    parser.add_argument('--rate-limit-every', type=int, default=0, help="answer every Nth request with 429")
+    args = parser.parse_args()
+
+    stub = StubNewsAPI(args.port, args.latency_ms, args.total, args.rate_limit_every)
+    print(f"Stub NewsAPI serving {args.total} articles at {stub.url}")
+    stub.server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,39 @@
+"""Tiny, locally built sentiment model so benchmarks run without a network download
+
+The model is a 2-layer DistilBERT classifier with random (seeded) weights and a
+WordPiece vocabulary built from the synthetic corpus words. Its predictions are
+meaningless, but it runs the real tokenizer, batching and backend code paths
+deterministically.
+"""
+
+import os
+import string
+
+from benchmarks.corpus import WORDS
+
+
+def build_tiny_model(path, seed=0):
+    """Save a tiny DistilBERT sentiment model and tokenizer to path (once) and return path"""
+    if os.path.exists(os.path.join(path, 'config.json')):
+        return path
+
+    import torch
+    from transformers import DistilBertConfig, DistilBertForSequenceClassification, DistilBertTokenizerFast
+
+    os.makedirs(path, exist_ok=True)
+    special = ['[PAD]', '[UNK]', '[CLS]', '[SEP]', '[MASK]']
+    characters = list(string.ascii_lowercase + string.digits + string.punctuation)
+    vocab = list(dict.fromkeys(special + characters + ['##' + c for c in string.ascii_lowercase + string.digits]
+                               + sorted(WORDS)))
+    vocab_file = os.path.join(path, 'vocab.txt')
+    with open(vocab_file, 'w') as f:
+        f.write('\n'.join(vocab))
+
+    torch.manual_seed(seed)
+    config = DistilBertConfig(
+        vocab_size=len(vocab), dim=64, hidden_dim=128, n_layers=2, n_heads=2,
+        id2label={0: 'NEGATIVE', 1: 'POSITIVE'}, label2id={'NEGATIVE': 0, 'POSITIVE': 1}
+    )
+    DistilBertForSequenceClassification(config).save_pretrained(path)
+    DistilBertTokenizerFast(vocab_file).save_pretrained(path)
+    return path